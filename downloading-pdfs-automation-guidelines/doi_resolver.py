@@ -0,0 +1,147 @@
+import logging
+import re
+from urllib.parse import urlsplit
+
+import requests
+
+from http_session import PDF_MAGIC_WINDOW, get_session, has_pdf_signature
+from rate_limiter import rate_limiter
+from static_resolver import fetch_citation_pdf_url
+
+VERIFY_TIMEOUT = 10
+VERIFY_BYTES = PDF_MAGIC_WINDOW
+
+# PDF URL templates by DOI prefix; {doi} is the full DOI and {suffix} the part after the prefix
+DOI_PREFIX_TEMPLATES = {
+    "10.1111": ("https://onlinelibrary.wiley.com/doi/pdf/{doi}",),  # Wiley
+    "10.1002": ("https://onlinelibrary.wiley.com/doi/pdf/{doi}",),  # Wiley
+    "10.1080": ("https://www.tandfonline.com/doi/pdf/{doi}",),  # Taylor & Francis
+    "10.1007": ("https://link.springer.com/content/pdf/{doi}.pdf",),  # Springer
+    "10.1186": ("https://link.springer.com/content/pdf/{doi}.pdf",),  # BioMed Central
+    "10.1038": ("https://www.nature.com/articles/{suffix}.pdf",),  # Nature
+    "10.6004": ("https://jnccn.org/doi/pdf/{doi}",),  # JNCCN
+    "10.1200": ("https://ascopubs.org/doi/pdf/{doi}",),  # ASCO
+    "10.1177": ("https://journals.sagepub.com/doi/pdf/{doi}",),  # SAGE
+    "10.1161": ("https://www.ahajournals.org/doi/pdf/{doi}",),  # American Heart Association
+    "10.1164": ("https://www.atsjournals.org/doi/pdf/{doi}",),  # American Thoracic Society
+    "10.7326": ("https://www.acpjournals.org/doi/pdf/{doi}",),  # American College of Physicians
+    "10.1089": ("https://www.liebertpub.com/doi/pdf/{doi}",),  # Mary Ann Liebert
+    "10.1055": ("https://www.thieme-connect.de/products/ejournals/pdf/{doi}.pdf",),  # Thieme
+    "10.3389": ("https://www.frontiersin.org/articles/{doi}/pdf",),  # Frontiers
+}
+
+# Atypon-hosted landing pages (Wiley, T&F, SAGE, ASCO, JNCCN, ...) serve the PDF at /doi/pdf/
+ATYPON_LANDING_PATTERN = re.compile(r"^/doi/(?:full/|abs/|epdf/|epub/)?(10\.\d{4,9}/.+)$", re.IGNORECASE)
+ELSEVIER_PII_PATTERN = re.compile(r"linkinghub\.elsevier\.com/retrieve/pii/([A-Z0-9]+)", re.IGNORECASE)
+
+
+def normalize_doi(doi):
+    """
+    Strip resolver prefixes and whitespace from a DOI.
+
+    Args:
+        doi (str): DOI as stored in the record, e.g. "10.1111/ene.14412" or "https://doi.org/10.1111/ene.14412".
+
+    Returns:
+        str: Bare DOI, or None if the value does not look like a DOI.
+    """
+    if not doi:
+        return None
+    doi = re.sub(r"^(?:https?://)?(?:dx\.)?doi\.org/", "", doi.strip(), flags=re.IGNORECASE)
+    return doi if doi.startswith("10.") else None
+
+
+def candidate_pdf_urls(guideline):
+    """
+    Build likely PDF URLs from the DOI and link fields of a guideline record.
+
+    Args:
+        guideline (dict): Guideline record with optional "DOI", "URL" and "link" fields.
+
+    Returns:
+        list: Candidate PDF URLs, most likely first, without case-insensitive duplicates.
+    """
+    candidates = []
+    doi = normalize_doi(guideline.get("DOI")) or normalize_doi(guideline.get("URL"))
+    link = guideline.get("link") or ""
+
+    if link:
+        landing = urlsplit(link)
+        atypon_match = ATYPON_LANDING_PATTERN.match(landing.path)
+        if atypon_match:
+            candidates.append(f"{landing.scheme}://{landing.netloc}/doi/pdf/{atypon_match.group(1)}")
+        elsevier_match = ELSEVIER_PII_PATTERN.search(link)
+        if elsevier_match:
+            candidates.append(
+                f"https://www.sciencedirect.com/science/article/pii/{elsevier_match.group(1)}/pdfft"
+            )
+        if landing.netloc.endswith("mdpi.com"):
+            candidates.append(link.rstrip("/") + "/pdf")
+
+    if doi:
+        prefix, _, suffix = doi.partition("/")
+        for template in DOI_PREFIX_TEMPLATES.get(prefix, ()):
+            candidates.append(template.format(doi=doi, suffix=suffix))
+
+    unique_candidates = {}
+    for candidate_url in candidates:
+        unique_candidates.setdefault(candidate_url.lower(), candidate_url)
+    return list(unique_candidates.values())
+
+
+def verify_pdf_url(url):
+    """
+    Check cheaply that a URL serves a PDF by reading only its first bytes.
+
+    The checked URL is returned rather than the final URL after redirects, because
+    publishers often redirect to signed CDN links that expire soon after.
+
+    Args:
+        url (str): Candidate PDF URL.
+
+    Returns:
+        str: url if it serves a PDF, otherwise None.
+    """
+    headers = {"Range": f"bytes=0-{VERIFY_BYTES - 1}", "Accept": "application/pdf,*/*;q=0.8"}
+    try:
+        with rate_limiter.limit(url), get_session().get(
+            url, headers=headers, stream=True, timeout=VERIFY_TIMEOUT
+        ) as response:
+            if response.status_code not in (200, 206):
+                return None
+            first_bytes = next(response.iter_content(chunk_size=VERIFY_BYTES), b"")
+            if has_pdf_signature(first_bytes):
+                return url
+    except requests.exceptions.RequestException as req_err:
+        logging.info(f"PDF candidate check failed for {url}: {req_err}")
+    return None
+
+
+def resolve_pdf_from_record(guideline):
+    """
+    Resolve a guideline PDF from its DOI and publisher URL patterns, without searching.
+
+    When no pattern works, the citation_pdf_url meta tag of the landing page in the "link"
+    field (or the DOI URL) is read from the page head, which avoids a browser for most
+    publisher pages.
+
+    Args:
+        guideline (dict): Guideline record.
+
+    Returns:
+        str: Verified PDF URL if one of the candidates works, otherwise None.
+    """
+    for candidate_url in candidate_pdf_urls(guideline):
+        pdf_url = verify_pdf_url(candidate_url)
+        if pdf_url:
+            logging.info(f"Resolved PDF from DOI/publisher pattern: {pdf_url}")
+            return pdf_url
+
+    landing_url = guideline.get("link") or guideline.get("URL")
+    if landing_url:
+        meta_pdf_url = fetch_citation_pdf_url(landing_url)
+        pdf_url = meta_pdf_url and verify_pdf_url(meta_pdf_url)
+        if pdf_url:
+            logging.info(f"Resolved PDF from citation_pdf_url meta tag: {pdf_url}")
+            return pdf_url
+    return None
@@ -1,80 +1,283 @@
+import hashlib
+import json
 import logging
 import os
-import shutil  # For deleting empty folders
 import time
 
-import requests
-import undetected_chromedriver as uc
-import wget
-from selenium.webdriver.common.by import By
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from tqdm import tqdm
+
+from http_session import DOWNLOAD_CHUNK_SIZE, DOWNLOAD_TIMEOUT, get_session, has_pdf_signature
+from pdf_ranking import best_pdf_link
+from rate_limiter import rate_limiter
+from retry_policy import (
+    BLOCKED,
+    TRANSIENT,
+    WRONG_CONTENT,
+    ClassifiedError,
+    RetryPolicy,
+    classify_exception,
+)
+from static_resolver import static_extract_pdf_from_webpage
+
+# Per-source wait settings. "timeout" is the longest we wait for a page to settle,
+# "no_results" is a CSS selector that proves the page rendered without a match, and
+# "ready_grace" (seconds) treats a fully loaded document that still lacks the target
+# after that grace period as "no results"; None disables that shortcut.
+WAIT_PROFILES = {
+    "pmc": {"timeout": 10, "no_results": None, "ready_grace": 1.5},
+    "webpage": {"timeout": 10, "no_results": None, "ready_grace": 1.5},
+    "trip_database": {"timeout": 10, "no_results": ".no-results, .search-no-results", "ready_grace": None},
+    "google": {"timeout": 10, "no_results": "#topstuff .card-section, #botstuff .card-section", "ready_grace": None},
+    "ebm_portal": {"timeout": 10, "no_results": ".view-empty", "ready_grace": None},
+    "ebm_portal_guideline": {"timeout": 10, "no_results": None, "ready_grace": 1.5},
+}
+WAIT_POLL_INTERVAL = 0.25
+
+# Markers of captcha or bot-protection pages; seeing any of them ends the wait immediately
+BLOCK_SELECTORS = (
+    "iframe[src*='recaptcha'], iframe[src*='hcaptcha'], iframe[src*='challenges.cloudflare.com'], "
+    "#challenge-form, #challenge-running, form#captcha-form"
+)
+BLOCK_URL_MARKERS = ("google.com/sorry", "/captcha", "cdn-cgi/challenge-platform")
+
+# Page state for one wait_for_page poll, read in a single WebDriver round trip:
+# [first target element or null, block marker present, no-results marker present, readyState, URL]
+WAIT_STATE_SCRIPT = """
+const [targetSelector, blockSelector, noResultsSelector] = arguments;
+return [
+    document.querySelector(targetSelector),
+    document.querySelector(blockSelector) !== null,
+    noResultsSelector ? document.querySelector(noResultsSelector) !== null : false,
+    document.readyState,
+    location.href,
+];
+"""
+
+# Everything the extractors read from a page, collected in a single WebDriver round trip.
+# Returns one object per result element (or one for the whole document when no result
+# selector is given) with the requested text fields and its matching links as
+# {href, text}; hrefs are absolute, as resolved by the browser. The whole-document object
+# also carries the page URL and its citation_pdf_url meta tag.
+EXTRACT_PAGE_SCRIPT = """
+const [resultSelector, textFields, linkSelector] = arguments;
+const text = (element) => element ? (element.innerText || element.textContent || "").trim() : null;
+const roots = resultSelector ? Array.from(document.querySelectorAll(resultSelector)) : [document];
+return roots.map((root) => {
+    const item = {
+        links: Array.from(root.querySelectorAll(linkSelector))
+            .filter((anchor) => anchor.href)
+            .map((anchor) => ({href: anchor.href, text: text(anchor)})),
+    };
+    for (const [name, selector] of Object.entries(textFields)) {
+        item[name] = text(root.querySelector(selector));
+    }
+    if (!resultSelector) {
+        const citation = document.querySelector("meta[name='citation_pdf_url']");
+        item.page_url = location.href;
+        item.citation_pdf_url = citation ? citation.content : null;
+    }
+    return item;
+});
+"""
+
+# Candidate full-text links on PMC and publisher pages; pdf_ranking picks the best one
+PDF_CANDIDATE_SELECTOR = "a[href*='pdf' i]"
+PDF_READY_SELECTOR = f"{PDF_CANDIDATE_SELECTOR}, meta[name='citation_pdf_url']"
+
+# PDF validation - responses with another Content-Type, or whose first chunk lacks the PDF
+# signature, are aborted before anything is written to disk
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/octet-stream", "binary/octet-stream")
+
+# Retries for transient and rate-limited download failures; each retry resumes the .part file
+DOWNLOAD_RETRY_POLICY = RetryPolicy(max_attempts=4, base_delay=2.0, max_delay=60.0)
+# Retries for PMC and publisher pages opened from Google results
+FOLLOW_UP_RETRY_POLICY = RetryPolicy(max_attempts=2, base_delay=2.0, max_delay=10.0)
+
+
+def wait_for_page(driver, source, target_selector, cancel_event=None):
+    """
+    Wait until the target selector, a "no results" marker, or a block/captcha marker appears.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        source (str): Key into WAIT_PROFILES selecting the timeout and markers to use.
+        target_selector (str): CSS selector of the element the caller is looking for.
+        cancel_event (threading.Event, optional): Ends the wait early once set.
+
+    Returns:
+        tuple: A tuple containing:
+            outcome (str): "found", "no_results", "blocked", "cancelled" or "timeout".
+            element (WebElement, optional): First matching target element when found.
+    """
+    profile = WAIT_PROFILES[source]
+    started_at = time.monotonic()
+
+    def settled(current_driver):
+        if cancel_event is not None and cancel_event.is_set():
+            return "cancelled", None
+        target, block_marker, no_results_marker, ready_state, current_url = current_driver.execute_script(
+            WAIT_STATE_SCRIPT, target_selector, BLOCK_SELECTORS, profile["no_results"]
+        )
+        if target is not None:
+            return "found", target
+        if block_marker or any(marker in current_url.lower() for marker in BLOCK_URL_MARKERS):
+            return "blocked", None
+        if no_results_marker:
+            return "no_results", None
+        if (
+            profile["ready_grace"] is not None
+            and time.monotonic() - started_at >= profile["ready_grace"]
+            and ready_state == "complete"
+        ):
+            return "no_results", None
+        return False
+
+    try:
+        return WebDriverWait(driver, profile["timeout"], poll_frequency=WAIT_POLL_INTERVAL).until(
+            settled
+        )
+    except TimeoutException:
+        return "timeout", None
+
+
+def extract_page_data(driver, link_selector, result_selector=None, text_fields=None):
+    """
+    Read links and text from the current page with a single execute_script call.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        link_selector (str): CSS selector of the links to collect.
+        result_selector (str, optional): CSS selector of result elements; each one yields an
+            item with its own links and fields. The whole document is one item when omitted.
+        text_fields (dict, optional): Field name -> CSS selector whose text is read per item.
+
+    Returns:
+        list: One dict per item, with a "links" list of {"href", "text"} dicts and one key
+            per text field (None when the field is missing).
+    """
+    return driver.execute_script(EXTRACT_PAGE_SCRIPT, result_selector, text_fields or {}, link_selector)
+
+
+def _best_pdf_link(driver, title=None):
+    """Rank every PDF candidate on the current page and return the best one, or None."""
+    page = extract_page_data(driver, PDF_CANDIDATE_SELECTOR)[0]
+    candidates = [(link["href"], link["text"]) for link in page["links"]]
+    return best_pdf_link(candidates, page["page_url"], title, page["citation_pdf_url"])
+
+
+def _first_link(driver, link_selector):
+    """Return the href of the first link on the page matching link_selector, or None."""
+    links = extract_page_data(driver, link_selector)[0]["links"]
+    return links[0]["href"] if links else None
+
+
+def _load_page(driver, url):
+    """Navigate the browser to url within the per-host rate limit."""
+    with rate_limiter.limit(url):
+        driver.get(url)
+
+
+def _raise_for_wait_outcome(outcome, url):
+    """Raise a ClassifiedError for wait outcomes that are failures rather than missing results."""
+    if outcome == "timeout":
+        raise ClassifiedError(TRANSIENT, f"Timed out waiting for {url}")
+    if outcome == "blocked":
+        raise ClassifiedError(BLOCKED, f"Blocked or captcha page at {url}")
 
 
-def extract_pmc_pdf(driver, pmc_url):
+def _follow_up(extract, driver, url, cancel_event=None, title=None):
     """
-    Extract and return the PDF link from a PubMed Central (PMC) page.
+    Run a page extractor on a link found in search results, retrying it against its own host.
+
+    Failures are logged and reported as "no PDF" so a slow or blocking publisher page does
+    not count against the search engine that linked to it.
+    """
+    try:
+        return FOLLOW_UP_RETRY_POLICY.call(extract, driver, url, cancel_event, title, host=urlsplit(url).netloc)
+    except ClassifiedError as classified_err:
+        logging.warning(f"Giving up on {url} ({classified_err.category}): {classified_err}")
+        return None
+
+
+def extract_pmc_pdf(driver, pmc_url, cancel_event=None, title=None):
+    """
+    Extract and return the best-ranked PDF link from a PubMed Central (PMC) page.
 
     Args:
         driver: Selenium WebDriver instance.
         pmc_url (str): URL of the PubMed Central page.
+        cancel_event (threading.Event, optional): Abandons the page wait once set.
+        title (str, optional): Guideline title, used to rank the candidate links.
 
     Returns:
         str: PDF URL if found, otherwise None.
     """
-    driver.get(pmc_url)
-    time.sleep(5)
+    _load_page(driver, pmc_url)
 
     try:
-        pdf_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "a[href$='.pdf']"))
-        )
-        pdf_url = pdf_element.get_attribute("href")
-        if pdf_url.startswith("/pdf"):
-            pdf_url = pmc_url.split("/PMC")[0] + pdf_url
+        outcome, _ = wait_for_page(driver, "pmc", PDF_READY_SELECTOR, cancel_event)
+        _raise_for_wait_outcome(outcome, pmc_url)
+        pdf_url = _best_pdf_link(driver, title) if outcome == "found" else None
+        if not pdf_url:
+            logging.warning(f"No PDF link on PMC page ({outcome}): {pmc_url}")
+            return None
         logging.info(f"Found PDF on PMC: {pdf_url}")
         return pdf_url
+    except ClassifiedError:
+        raise  # Timeouts and block pages are failures, not "no PDF"; let the caller retry
     except Exception as exception_err:  # More descriptive variable name
         logging.error(f"Failed to extract PDF from PMC: {exception_err}")
         return None
 
 
-def extract_pdf_from_webpage(driver, webpage_url):
+def extract_pdf_from_webpage(driver, webpage_url, cancel_event=None, title=None):
     """
-    Visit a webpage and attempt to find a downloadable PDF link.
+    Visit a webpage and return its best-ranked downloadable PDF link.
 
     Args:
         driver: Selenium WebDriver instance.
         webpage_url (str): URL of the webpage to check.
+        cancel_event (threading.Event, optional): Abandons the page wait once set.
+        title (str, optional): Guideline title, used to rank the candidate links.
 
     Returns:
         str: PDF URL if found, otherwise None.
     """
-    driver.get(webpage_url)
-    time.sleep(5)
+    # Most landing pages are static HTML; only load them in the browser if that finds nothing
+    pdf_url = static_extract_pdf_from_webpage(webpage_url, title)
+    if pdf_url:
+        return pdf_url
+
+    _load_page(driver, webpage_url)
 
     try:
-        pdf_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "a[href$='.pdf']"))
-        )
-        pdf_url = pdf_element.get_attribute("href")
-        if pdf_url.startswith("/"):
-            pdf_url = webpage_url.rstrip("/") + pdf_url
+        outcome, _ = wait_for_page(driver, "webpage", PDF_READY_SELECTOR, cancel_event)
+        _raise_for_wait_outcome(outcome, webpage_url)
+        pdf_url = _best_pdf_link(driver, title) if outcome == "found" else None
+        if not pdf_url:
+            logging.warning(f"No PDF link on webpage ({outcome}): {webpage_url}")
+            return None
         logging.info(f"Found PDF on webpage: {pdf_url}")
         return pdf_url
+    except ClassifiedError:
+        raise  # Timeouts and block pages are failures, not "no PDF"; let the caller retry
     except Exception as exception_err:  # More descriptive variable name
         logging.error(f"No PDF link found on webpage: {exception_err}")
         return None
 
 
-def search_trip_database(driver, expected_title):
+def search_trip_database(driver, expected_title, cancel_event=None):
     """
     Search Trip Database for a given title, verify it, and extract category and first PDF URL.
 
     Args:
         driver: Selenium WebDriver instance.
         expected_title (str): The expected title of the guideline.
+        cancel_event (threading.Event, optional): Abandons the page wait once set.
 
     Returns:
         tuple: A tuple containing:
@@ -83,14 +286,21 @@ def search_trip_database(driver, expected_title):
     """
     formatted_title = expected_title.replace(" ", "%20")
     search_url = f"https://www.tripdatabase.com/Searchresult?criteria={formatted_title}&search_type=standard"
-    driver.get(search_url)
-    time.sleep(5)
+    _load_page(driver, search_url)
 
     try:
-        first_result = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".result"))
-        )
-        actual_title = first_result.find_element(By.CSS_SELECTOR, "a h5").text.strip()
+        outcome, _ = wait_for_page(driver, "trip_database", ".result", cancel_event)
+        _raise_for_wait_outcome(outcome, search_url)
+        if outcome != "found":
+            logging.warning(f"No Trip Database result ({outcome}) for: {expected_title}")
+            return None, None
+        first_result = extract_page_data(
+            driver,
+            "a[href$='.pdf']",
+            result_selector=".result",
+            text_fields={"title": "a h5", "badge": ".result--taxonomies .badge-evidence-secondary"},
+        )[0]
+        actual_title = first_result["title"] or ""
         logging.info(f"Found Title in Trip Database: {actual_title}")
 
         if actual_title.lower() != expected_title.lower():
@@ -99,39 +309,41 @@ def search_trip_database(driver, expected_title):
             )
             return None, None
 
-        category_label = first_result.find_element(
-            By.CSS_SELECTOR, ".result--taxonomies .badge-evidence-secondary"
-        ).text.strip()
-        pdf_element = first_result.find_elements(By.CSS_SELECTOR, "a[href$='.pdf']")
-        pdf_link = pdf_element[0].get_attribute("href") if pdf_element else None
+        category_label = first_result["badge"]
+        pdf_link = first_result["links"][0]["href"] if first_result["links"] else None
 
         return category_label, pdf_link
+    except ClassifiedError:
+        raise  # Timeouts and block pages are failures, not "no PDF"; let the caller retry
     except Exception as exception_err:  # More descriptive variable name
         logging.error(f"Error extracting from Trip Database: {exception_err}")
         return None, None
 
 
-def google_search_for_pdf(driver, title):
+def google_search_for_pdf(driver, title, cancel_event=None):
     """
     Perform a Google search to find the first valid PDF, PMC, or webpage.
 
     Args:
         driver: Selenium WebDriver instance.
         title (str): The title of the guideline to search for.
+        cancel_event (threading.Event, optional): Abandons the page wait once set.
 
     Returns:
         str: URL of the PDF, PMC, or webpage if found, otherwise None.
     """
     search_query = f"{title} full text pdf"
     google_url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
-    driver.get(google_url)
-    time.sleep(5)
+    _load_page(driver, google_url)
 
     try:
-        search_results = driver.find_elements(By.CSS_SELECTOR, "div.tF2Cxc a")[:3]
-        links = list(
-            set(result.get_attribute("href").split("#")[0] for result in search_results)
-        )
+        outcome, _ = wait_for_page(driver, "google", "div.tF2Cxc a", cancel_event)
+        _raise_for_wait_outcome(outcome, google_url)
+        if outcome != "found":
+            logging.warning(f"No Google results ({outcome}) for: {title}")
+            return None
+        search_results = extract_page_data(driver, "div.tF2Cxc a")[0]["links"][:3]
+        links = list(set(result["href"].split("#")[0] for result in search_results))
 
         pmc_url = None
         webpage_url = None
@@ -153,7 +365,7 @@ def google_search_for_pdf(driver, title):
 
         if pmc_url:
             logging.info(f"No direct PDF found in Google, but found PMC: {pmc_url}")
-            return extract_pmc_pdf(driver, pmc_url)
+            return _follow_up(extract_pmc_pdf, driver, pmc_url, cancel_event, title)
 
         if webpage_url:
             if "login" in webpage_url.lower():
@@ -161,103 +373,182 @@ def google_search_for_pdf(driver, title):
             logging.info(
                 f"No direct PDF or PMC found in Google, extracting from webpage: {webpage_url}"
             )
-            return extract_pdf_from_webpage(driver, webpage_url)
+            return _follow_up(extract_pdf_from_webpage, driver, webpage_url, cancel_event, title)
 
         logging.warning("No direct PDF, PMC, or valid webpage found in Google search results.")
         return None
 
+    except ClassifiedError:
+        raise  # Timeouts and block pages are failures, not "no PDF"; let the caller retry
     except Exception as exception_err:  # More descriptive variable name
         logging.error(f"Google search error: {exception_err}")
         return None
 
 
+def _load_part_metadata(meta_path, pdf_url):
+    """Return the validators saved with a partial download of pdf_url, or None."""
+    try:
+        with open(meta_path, "r") as meta_file:
+            metadata = json.load(meta_file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return metadata if metadata.get("url") == pdf_url else None
+
+
+def _discard_partial_download(part_path, meta_path):
+    """Delete a partial download and its metadata."""
+    for path in (part_path, meta_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _download_once(pdf_url, save_path):
+    """Make one download attempt; see download_pdf_file. Returns the SHA-256 hex digest."""
+    part_path = f"{save_path}.part"
+    meta_path = f"{part_path}.json"
+
+    headers = {}
+    metadata = _load_part_metadata(meta_path, pdf_url)
+    resume_from = os.path.getsize(part_path) if metadata and os.path.exists(part_path) else 0
+    validator = metadata and (metadata.get("etag") or metadata.get("last_modified"))
+    if resume_from and validator:
+        headers["Range"] = f"bytes={resume_from}-"
+        headers["If-Range"] = validator
+    else:
+        resume_from = 0
+
+    with rate_limiter.limit(pdf_url), get_session().get(
+        pdf_url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+    ) as response:
+        if response.status_code == 416:
+            # Our partial file no longer matches the remote one; the retry starts over
+            _discard_partial_download(part_path, meta_path)
+        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+
+        chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        first_chunk = next(chunks, b"")
+
+        digest = hashlib.sha256()
+        if response.status_code == 206:
+            logging.info(f"Resuming PDF download at byte {resume_from}: {pdf_url}")
+            file_mode = "ab"
+            with open(part_path, "rb") as existing_part:
+                for block in iter(lambda: existing_part.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    digest.update(block)
+        else:
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in PDF_CONTENT_TYPES:
+                raise ClassifiedError(WRONG_CONTENT, f"Content-Type is {content_type}")
+            if not has_pdf_signature(first_chunk):
+                raise ClassifiedError(WRONG_CONTENT, "response does not start with a PDF signature")
+
+            file_mode = "wb"
+            with open(meta_path, "w") as meta_file:
+                json.dump(
+                    {
+                        "url": pdf_url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    },
+                    meta_file,
+                )
+
+        with open(part_path, file_mode) as pdf_file:
+            pdf_file.write(first_chunk)
+            digest.update(first_chunk)
+            for chunk in chunks:
+                pdf_file.write(chunk)
+                digest.update(chunk)
+
+    os.replace(part_path, save_path)
+    os.remove(meta_path)
+    return digest.hexdigest()
+
+
 def download_pdf_file(pdf_url, save_path):
     """
-    Download the PDF file from a given URL using wget, with fallback to requests.
+    Download the PDF file from a given URL, resuming an earlier partial download if possible.
+
+    Bytes are streamed to ``save_path + ".part"``; the ETag or Last-Modified validator of the
+    response is kept next to it. A later attempt for the same URL sends a Range request with
+    If-Range, so the server either continues from where the previous attempt stopped or, if
+    the file changed, sends it again from the start.
+
+    Fresh transfers are validated before anything is written: the Content-Type must be a PDF
+    (or generic binary) type and the first chunk must carry the %PDF- signature. Landing
+    pages, paywalls and cookie walls are aborted after their first chunk.
+
+    The SHA-256 of the file is computed while streaming, so it can be content-addressed
+    without reading it back from disk.
+
+    Transient and rate-limited failures are retried by DOWNLOAD_RETRY_POLICY; every retry
+    resumes from the bytes already on disk.
 
     Args:
         pdf_url (str): URL of the PDF file.
         save_path (str): Path to save the downloaded PDF.
 
     Returns:
-        bool: True if download successful, False otherwise.
+        tuple: A tuple containing:
+            saved (bool): True if download successful, False otherwise.
+            failure_reason (str, optional): Failure category from retry_policy when saved is False.
+            sha256 (str, optional): Hex digest of the saved file when saved is True.
     """
     try:
-        wget.download(pdf_url, out=save_path)
-        logging.info(f"Successfully downloaded PDF using wget: {save_path}")
-        return True
-    except Exception as wget_error:  # More descriptive variable name
-        logging.error(f"wget download failed: {wget_error}")
-        logging.info("Falling back to requests for PDF download...")
-        try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
-            }
-            response = requests.get(pdf_url, headers=headers, stream=True, timeout=30) # Increased timeout
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-
-            with open(save_path, "wb") as pdf_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    pdf_file.write(chunk)
-
-            logging.info(f"Successfully downloaded PDF using requests: {save_path}")
-            return True
-
-        except requests.exceptions.HTTPError as http_err:
-            logging.error(f"Requests HTTP Error: {http_err}")
-            logging.error(f"PDF download failed using requests: HTTP Error - {http_err}")
-            return False
-        except requests.exceptions.RequestException as req_err:
-            logging.error(f"Requests error: {req_err}")
-            logging.error(f"PDF download failed using requests: Request Exception - {req_err}")
-            return False
-        except Exception as exception_err:  # More descriptive variable name
-            logging.error(f"Unexpected error during requests download: {exception_err}")
-            logging.error(
-                f"PDF download failed using requests: Unexpected Error - {exception_err}"
-            )
-            return False
+        sha256 = DOWNLOAD_RETRY_POLICY.call(_download_once, pdf_url, save_path, host=urlsplit(pdf_url).netloc)
+        logging.info(f"Successfully downloaded PDF: {save_path}")
+        return True, None, sha256
+    except Exception as exception_err:
+        failure_reason = classify_exception(exception_err)
+        logging.error(f"PDF download failed ({failure_reason}): {pdf_url} - {exception_err}")
+        return False, failure_reason, None
 
 
-def search_ebm_portal(driver, title):
+def search_ebm_portal(driver, title, cancel_event=None):
     """
     Search for a guideline on EBM Portal and extract the PDF link.
 
     Args:
         driver: Selenium WebDriver instance.
         title (str): The title of the guideline to search for.
+        cancel_event (threading.Event, optional): Abandons the page wait once set.
 
     Returns:
         str: PDF URL if found, otherwise None.
     """
     search_url = f"https://guidelines.ebmportal.com/?q={title.replace(' ', '+')}"
-    driver.get(search_url)
-    time.sleep(5)
+    _load_page(driver, search_url)
 
     try:
-        # Click on the first search result
-        first_result = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "article.node"))
-        )
+        # Wait for the first search result
+        outcome, first_result = wait_for_page(driver, "ebm_portal", "article.node", cancel_event)
+        _raise_for_wait_outcome(outcome, search_url)
+        if outcome != "found":
+            logging.warning(f"No EBM Portal result ({outcome}) for: {title}")
+            return None
 
         # Click on the first result to open the guideline page
-        first_result.click()
-        time.sleep(5)
+        with rate_limiter.limit(search_url):
+            first_result.click()
+        WebDriverWait(driver, WAIT_PROFILES["ebm_portal_guideline"]["timeout"]).until(
+            EC.staleness_of(first_result)
+        )
 
         # Locate the PDF download link
-        pdf_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (
-                    By.CSS_SELECTOR,
-                    "a.btn.btn-default.button[href$='.pdf']",
-                )
-            )
+        outcome, _ = wait_for_page(
+            driver, "ebm_portal_guideline", "a.btn.btn-default.button[href$='.pdf']", cancel_event
         )
+        _raise_for_wait_outcome(outcome, search_url)
+        if outcome != "found":
+            logging.warning(f"No PDF link on EBM Portal guideline page ({outcome}) for: {title}")
+            return None
 
-        pdf_url = pdf_element.get_attribute("href")
+        pdf_url = _first_link(driver, "a.btn.btn-default.button[href$='.pdf']")
         logging.info(f"Found PDF on EBM Portal: {pdf_url}")
         return pdf_url
 
+    except ClassifiedError:
+        raise  # Timeouts and block pages are failures, not "no PDF"; let the caller retry
     except Exception as exception_err:  # More descriptive variable name
         logging.error(f"Error extracting from EBM Portal: {exception_err}")
         return None
\ No newline at end of file
@@ -1,46 +1,210 @@
+import argparse
+import atexit
+import functools
+import glob
 import json
 import logging
+import multiprocessing
 import os
+import queue
 import shutil  # For deleting empty folders
+import signal
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
 import undetected_chromedriver as uc
-import wget
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from tqdm import tqdm
 
+from doi_resolver import resolve_pdf_from_record, verify_pdf_url
+from driver_pool import DriverPool
+from guideline_io import GuidelineRecord, iter_guidelines
+from pdf_store import PdfStore, canonical_url
+from pipeline import run_pipeline
+from rate_limiter import rate_limiter
+from results_journal import ResultsJournal
+from retry_policy import (
+    BLOCKED,
+    FAILURE_CATEGORIES,
+    RATE_LIMITED,
+    TRANSIENT,
+    UNEXPECTED,
+    RetryPolicy,
+    classify_exception,
+)
+from search_cache import NegativeCache, SearchCache, normalize_title
+from state_store import RECORD_ID_PREFIXES, StateStore, record_id
 from download_functions import (
     download_pdf_file,
     google_search_for_pdf,
     search_ebm_portal,
     search_trip_database,
 )
+from static_resolver import static_search_ebm_portal, static_search_trip_database
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# File paths - Constants in UPPER_CASE for PEP-8
+# File paths - Constants in UPPER_CASE for PEP-8. INPUT_FILE, OUTPUT_FILE, CHECKPOINT_FILE,
+# STATE_DB_FILE and SEARCH_CACHE_FILE are the defaults of --input, --output, --checkpoint,
+# --state-db and --search-cache
 INPUT_FILE = "final_guidelines_v6.json"
 OUTPUT_FILE = "final_guidelines_v7.json"
 OUTPUT_FOLDER = "guidelines_database"
+PDF_STORE_FOLDER = os.path.join(OUTPUT_FOLDER, "_by_sha256")  # Each distinct PDF once, named by hash
 CHECKPOINT_FILE = "checkpoint.json"
+# Checkpoint writes are batched - flushed every CHECKPOINT_FLUSH_EVERY results or
+# CHECKPOINT_FLUSH_INTERVAL seconds, whichever comes first, and once more on exit
+CHECKPOINT_FLUSH_EVERY = 50
+CHECKPOINT_FLUSH_INTERVAL = 30.0
+STATE_DB_FILE = "guidelines_state.sqlite3"  # Per-guideline status, source, attempts, timings and errors
+JOURNAL_SUFFIX = ".journal.jsonl"  # Per-record updates kept next to the output file until compaction
+# --shard runs keep their journal and checkpoint in files tagged with the shard, e.g.
+# checkpoint.shard-1-of-4.json, until a run without --shard merges them
+SHARD_TAG = ".shard-{index}-of-{count}"
+SHARD_TAG_PATTERN = ".shard-*-of-*"
+
+# Run modes - "resolve" only finds PDF URLs, "download" also downloads them (reusing URLs found
+# by an earlier resolve run), "retry-failed" downloads only guidelines that failed before and
+# "merge" only folds the journals and checkpoints of --shard runs into the output
+RUN_MODES = ("download", "resolve", "retry-failed", "merge")
+
+# Search result cache - reruns reuse EBM Portal, Trip Database and Google results per title
+SEARCH_CACHE_FILE = "search_cache.sqlite3"
+SEARCH_CACHE_TTL = 30 * 24 * 3600  # Seconds
+SEARCH_CACHE_MAX_ENTRIES = 50000
+# Failed searches, downloads and guidelines are not retried until the TTL of their failure
+# reason expires, unless --retry-failed is given. Failures unlikely to change (not_found,
+# wrong_content, no_results) wait NEGATIVE_CACHE_TTL. Transient and rate-limited failures
+# already used up their retries within the run but are retried on the next run, which also
+# resumes their partial downloads.
+NEGATIVE_CACHE_TTL = 7 * 24 * 3600  # Seconds
+NEGATIVE_CACHE_REASON_TTLS = {
+    TRANSIENT: 0,
+    RATE_LIMITED: 0,
+    BLOCKED: 6 * 3600,
+    UNEXPECTED: 24 * 3600,
+}
+NO_RESULTS = "no_results"  # Failure reason of searches that found nothing
+
+# Source racing - query EBM Portal, Trip Database and Google concurrently for each title.
+# RACE_WAIT_FOR_CATEGORY lets Trip Database finish after a winner so its category label is kept.
+# Defaults of --race and --race-wait-category
+RACE_SOURCES = False
+RACE_WAIT_FOR_CATEGORY = False
+
+# Per-process pipeline - browser resolvers feed a bounded queue drained by download threads
+RESOLVER_WORKERS = 1
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_QUEUE_SIZE = 8
+
+# WebDriver pool - drivers are reused across titles and recycled after DRIVER_MAX_PAGES loads.
+# Each resolver needs one driver, or one per search source when racing (see configure_run)
+DRIVER_MAX_PAGES = 100
+
+# Retries for browser searches; a 429 or block page also cools the search host down for every worker
+SEARCH_RETRY_POLICY = RetryPolicy(max_attempts=3, base_delay=5.0, max_delay=60.0, rate_limit_cooldown=300.0)
+
+# Worker processes - each gets its own stripe of the corpus and its own browser. Default of --workers
+NUM_WORKERS = os.cpu_count() or 1
+
+
+def load_checkpoint(checkpoint_path=CHECKPOINT_FILE):
+    """Load or create checkpoint JSON file as sets of record IDs per status."""
+    checkpoint_data = {}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as checkpoint_file:
+            checkpoint_data = json.load(checkpoint_file)
+    return {status: set(checkpoint_data.get(status, [])) for status in ("completed", "failed")}
+
+
+def save_checkpoint(checkpoint_data, checkpoint_path=CHECKPOINT_FILE):
+    """
+    Save checkpoint to JSON file, one sorted list of unique record IDs per status.
+
+    The file is written to a temporary path, fsynced and renamed over the old one, so a
+    crash mid-write leaves the previous checkpoint intact.
+    """
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, "w") as checkpoint_file:
+        json.dump({status: sorted(ids) for status, ids in checkpoint_data.items()}, checkpoint_file, indent=4)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temp_path, checkpoint_path)
+
+
+def shard_file(path, shard, pattern=False):
+    """
+    Return the journal or checkpoint path of a --shard run.
+
+    Args:
+        path (str): Path used by runs without --shard, e.g. "checkpoint.json".
+        shard (tuple): (i, N) from --shard.
+        pattern (bool): Return a glob pattern matching the files of every shard instead.
+
+    Returns:
+        str: path with the shard tag before its extension, or path itself when N is 1.
+    """
+    root, extension = os.path.splitext(path)
+    if pattern:
+        return glob.escape(root) + SHARD_TAG_PATTERN + extension
+    shard_index, shard_count = shard
+    if shard_count == 1:
+        return path
+    return root + SHARD_TAG.format(index=shard_index, count=shard_count) + extension
+
+
+def iter_updated_guidelines(source_file, journaled_updates, start=0, end=None):
+    """
+    Stream guideline records from source_file with journaled updates applied.
 
+    Args:
+        source_file (str): Guideline JSON or JSONL file.
+        journaled_updates (dict): Position -> fields, from ResultsJournal.load_updates().
+        start (int): Position of the first record to yield.
+        end (int, optional): Position after the last record to yield.
 
-def load_checkpoint():
-    """Load or create checkpoint JSON file."""
-    if os.path.exists(CHECKPOINT_FILE):
-        with open(CHECKPOINT_FILE, "r") as checkpoint_file:
-            return json.load(checkpoint_file)
-    return {"completed": [], "failed": []}
+    Yields:
+        tuple: (position, guideline) pairs.
+    """
+    for position, guideline in iter_guidelines(source_file, start, end):
+        guideline.update(journaled_updates.get(position, {}))
+        yield position, guideline
 
 
-def save_checkpoint(checkpoint_data):
-    """Save checkpoint to JSON file."""
-    with open(CHECKPOINT_FILE, "w") as checkpoint_file:
-        json.dump(checkpoint_data, checkpoint_file, indent=4)
+def exit_on_sigterm(signum, frame):
+    """Turn SIGTERM into SystemExit so pending checkpoint and journal writes are flushed."""
+    raise SystemExit(128 + signum)
+
+
+def migrate_checkpoint_titles(checkpoint_data, guidelines):
+    """
+    Replace title entries left by older checkpoints with the record IDs of those titles.
+
+    Args:
+        checkpoint_data (dict): Checkpoint from load_checkpoint(), updated in place.
+        guidelines (iterable): All guideline records; only read if the checkpoint has titles.
+    """
+    legacy_titles = {
+        entry for entries in checkpoint_data.values() for entry in entries if not entry.startswith(RECORD_ID_PREFIXES)
+    }
+    if not legacy_titles:
+        return
+
+    ids_by_title = {}
+    for guideline in guidelines:
+        if guideline["title"] in legacy_titles:
+            ids_by_title.setdefault(guideline["title"], []).append(record_id(guideline))
+
+    for status, entries in checkpoint_data.items():
+        migrated = set()
+        for entry in entries:
+            if entry.startswith(RECORD_ID_PREFIXES):
+                migrated.add(entry)
+            else:
+                migrated.update(ids_by_title.get(entry, ()))
+        checkpoint_data[status] = migrated
+    checkpoint_data["failed"] -= checkpoint_data["completed"]  # Older checkpoints could list a title in both
 
 
 def setup_selenium():
@@ -53,97 +217,775 @@ def setup_selenium():
     return driver
 
 
-def get_category_and_pdf(title):
+driver_pool = DriverPool(setup_selenium, size=RESOLVER_WORKERS, max_pages=DRIVER_MAX_PAGES)
+atexit.register(driver_pool.close)
+# Command line options the lookups depend on; set by configure_run in the parent and every worker process
+run_options = {
+    "race": RACE_SOURCES,
+    "wait_for_category": RACE_WAIT_FOR_CATEGORY,
+    "search_cache_file": SEARCH_CACHE_FILE,
+}
+pdf_store = PdfStore(PDF_STORE_FOLDER)
+search_cache = SearchCache(SEARCH_CACHE_FILE, SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES)
+negative_cache = NegativeCache(SEARCH_CACHE_FILE, NEGATIVE_CACHE_TTL, NEGATIVE_CACHE_REASON_TTLS)
+
+
+def _with_driver(search, title, cancel_event=None):
+    """Run a browser search with a pooled driver; each retry checks out a driver again."""
+    with driver_pool.driver() as driver:
+        return search(driver, title, cancel_event)
+
+
+def lookup_ebm_portal(title, cancel_event=None):
+    """
+    Search EBM Portal over plain HTTP, then in the browser if needed.
+
+    Args:
+        title (str): The title of the guideline to search for.
+        cancel_event (threading.Event, optional): Abandons the browser lookup once set.
+
+    Returns:
+        tuple: (category, pdf_link); EBM Portal never provides a category.
+    """
+    pdf_link = static_search_ebm_portal(title)
+    if pdf_link:
+        return None, pdf_link
+
+    return None, SEARCH_RETRY_POLICY.call(
+        _with_driver, search_ebm_portal, title, cancel_event, host="guidelines.ebmportal.com"
+    )
+
+
+def lookup_trip_database(title, cancel_event=None):
+    """
+    Search Trip Database over plain HTTP, then in the browser unless the static page was conclusive.
+
+    Args:
+        title (str): The title of the guideline to search for.
+        cancel_event (threading.Event, optional): Abandons the browser lookup once set.
+
+    Returns:
+        tuple: (category, pdf_link), either of which may be None.
+    """
+    trip_result = static_search_trip_database(title)
+    if trip_result is not None:
+        return trip_result
+
+    return SEARCH_RETRY_POLICY.call(
+        _with_driver, search_trip_database, title, cancel_event, host="www.tripdatabase.com"
+    )
+
+
+def lookup_google(title, cancel_event=None):
+    """
+    Search Google in the browser for a PDF, PMC article or landing page.
+
+    Args:
+        title (str): The title of the guideline to search for.
+        cancel_event (threading.Event, optional): Abandons the browser lookup once set.
+
+    Returns:
+        tuple: (category, pdf_link); Google never provides a category.
+    """
+    return None, SEARCH_RETRY_POLICY.call(
+        _with_driver, google_search_for_pdf, title, cancel_event, host="www.google.com"
+    )
+
+
+# Search lookups and the source names recorded for them in the state store
+SEARCH_SOURCES = {
+    lookup_ebm_portal: "ebm_portal",
+    lookup_trip_database: "trip_database",
+    lookup_google: "google",
+}
+
+
+def cached_lookup(lookup, title, cancel_event=None):
     """
-    Try EBM Portal first, then Trip Database, and finally Google search for a PDF link.
+    Run a search lookup, reusing its cached result for the same title if there is one.
+
+    Searches that found something are cached in search_cache. Searches that found nothing
+    or failed are remembered in negative_cache and skipped until the TTL of their failure reason expires.
 
     Args:
+        lookup (callable): One of the SEARCH_SOURCES lookups.
         title (str): The title of the guideline to search for.
+        cancel_event (threading.Event, optional): Abandons the browser lookup once set.
+
+    Returns:
+        tuple: (category, pdf_link), either of which may be None.
+    """
+    source = SEARCH_SOURCES[lookup]
+    cached_result = search_cache.get(source, title)
+    if cached_result is not None:
+        logging.info(f"Using cached {source} result for: {title}")
+        return tuple(cached_result)
+
+    title_key = normalize_title(title)
+    cached_failure = negative_cache.failure(source, title_key)
+    if cached_failure:
+        logging.info(f"Skipping {source}, it failed ({cached_failure[0]}) recently for: {title}")
+        return None, None
+
+    try:
+        category, pdf_link = lookup(title, cancel_event)
+    except Exception as exception_err:
+        negative_cache.record_failure(source, title_key, classify_exception(exception_err))
+        raise
+
+    if category or pdf_link:
+        search_cache.put(source, title, [category, pdf_link])
+    elif not (cancel_event and cancel_event.is_set()):  # A cancelled race loser proves nothing
+        negative_cache.record_failure(source, title_key, NO_RESULTS)
+    return category, pdf_link
+
+
+def failure_ttl(error):
+    """
+    Return how long a failed guideline is skipped, based on the error of its last attempt.
+
+    Args:
+        error (str): Error stored for the attempt - None when every source searched without
+            finding a PDF, a failure category, "source=category" pairs joined by ", ", or the
+            text of an unexpected exception.
+
+    Returns:
+        float: Seconds to skip the guideline; the shortest TTL of the listed categories.
+    """
+    if error is None:
+        return negative_cache.ttl_for(NO_RESULTS)
+    reasons = [part.rpartition("=")[2] for part in error.split(", ")]
+    if not all(reason in FAILURE_CATEGORIES for reason in reasons):
+        reasons = [UNEXPECTED]
+    return min(negative_cache.ttl_for(reason) for reason in reasons)
+
+
+def race_sources(title):
+    """
+    Query every search source concurrently and keep the first verified PDF link.
+
+    The remaining lookups are cancelled as soon as a winner is found, except Trip Database
+    when racing with wait_for_category, which is allowed to finish for its category label.
+
+    Args:
+        title (str): The title of the guideline to search for.
+
+    Returns:
+        tuple: (category, pdf_link, source, failures); failures maps the source name of
+            every lookup that raised to its failure category.
+    """
+    cancel_events = {lookup: threading.Event() for lookup in SEARCH_SOURCES}
+    executor = ThreadPoolExecutor(max_workers=len(SEARCH_SOURCES))
+    futures = {
+        executor.submit(cached_lookup, lookup, title, cancel_events[lookup]): lookup
+        for lookup in SEARCH_SOURCES
+    }
+    trip_future = next(future for future, lookup in futures.items() if lookup is lookup_trip_database)
+
+    category = None
+    pdf_link = None
+    source = None
+    unverified_pdf_link = None
+    unverified_source = None
+    failures = {}
+    try:
+        for future in as_completed(futures):
+            lookup = futures[future]
+            try:
+                found_category, found_pdf_link = future.result()
+            except Exception as exception_err:
+                failures[SEARCH_SOURCES[lookup]] = classify_exception(exception_err)
+                logging.error(f"{lookup.__name__} failed for {title}: {exception_err}")
+                continue
+
+            if lookup is lookup_trip_database:
+                category = found_category
+
+            if found_pdf_link and pdf_link is None:
+                if verify_pdf_url(found_pdf_link):
+                    pdf_link = found_pdf_link
+                    source = SEARCH_SOURCES[lookup]
+                    logging.info(f"{lookup.__name__} won the race for: {title}")
+                    for other_lookup, cancel_event in cancel_events.items():
+                        if not (run_options["wait_for_category"] and other_lookup is lookup_trip_database):
+                            cancel_event.set()
+                elif unverified_pdf_link is None:
+                    unverified_pdf_link = found_pdf_link
+                    unverified_source = SEARCH_SOURCES[lookup]
+
+            if pdf_link and (not run_options["wait_for_category"] or trip_future.done()):
+                break
+    finally:
+        for cancel_event in cancel_events.values():
+            cancel_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if pdf_link:
+        return category, pdf_link, source, failures
+    return category, unverified_pdf_link, unverified_source, failures
+
+
+def get_category_and_pdf(guideline):
+    """
+    Try the record's DOI/publisher patterns, then EBM Portal, Trip Database and finally Google.
+
+    DOI/publisher candidates, and the citation_pdf_url meta tag of the landing page, are
+    verified with a cheap HTTP request before any search, and search results must pass the
+    same check before the next source is skipped.
+    EBM Portal and Trip Database are then tried over plain HTTP; a browser is only
+    checked out of the pool when the static pages yield nothing or need JavaScript.
+    Search results are cached on disk, so reruns skip searches that already found something.
+    With --race, the three search sources run concurrently instead of in order.
+
+    Args:
+        guideline (GuidelineRecord): Guideline record; its title, DOI, URL and link fields are used.
 
     Returns:
         tuple: A tuple containing:
             category (str, optional): Category of the guideline (may be None).
             pdf_link (str, optional): URL of the PDF if found, otherwise None.
+            source (str, optional): Name of the source that produced pdf_link.
+            failures (dict): Failure category of every search source that raised, by source name.
     """
-    driver = setup_selenium()
+    title = guideline["title"]
+
+    # Step 0: Build PDF URLs from the DOI, publisher patterns and landing page meta tags - no search needed
+    pdf_link = resolve_pdf_from_record(guideline)
+    if pdf_link:
+        return None, pdf_link, "doi_pattern", {}
 
-    # Step 1: Search EBM Portal
+    if run_options["race"]:
+        return race_sources(title)
+
+    # Steps 1-3: EBM Portal, Trip Database, then Google. A link that does not serve a PDF
+    # (landing page, paywall, cookie wall) moves straight on to the next source.
     category = None
-    pdf_link = search_ebm_portal(driver, title)
+    unverified_pdf_link = None
+    unverified_source = None
+    failures = {}
+    for lookup, source in SEARCH_SOURCES.items():
+        try:
+            found_category, pdf_link = cached_lookup(lookup, title)
+        except Exception as exception_err:
+            failures[source] = classify_exception(exception_err)
+            logging.error(f"{source} failed ({failures[source]}) for {title}: {exception_err}")
+            continue
+        if lookup is lookup_trip_database:
+            category = found_category
+        if not pdf_link:
+            continue
+        if verify_pdf_url(pdf_link):
+            return category, pdf_link, source, failures
+        logging.warning(f"{source} link is not a PDF, trying the next source: {pdf_link}")
+        if unverified_pdf_link is None:
+            unverified_pdf_link, unverified_source = pdf_link, source
 
-    # Step 2: If no PDF found in EBM Portal, search in Trip Database
-    if not pdf_link:
-        category, pdf_link = search_trip_database(driver, title)
+    return category, unverified_pdf_link, unverified_source, failures
 
-    # Step 3: If no PDF found in Trip Database, perform Google search
-    if not pdf_link:
-        pdf_link = google_search_for_pdf(driver, title)
 
-    driver.quit()
-    return category, pdf_link
+def resolve_guideline(guideline, state_store=None):
+    """
+    Browser stage of the pipeline: find the PDF URL for a single guideline.
 
+    Args:
+        guideline (GuidelineRecord): Guideline record to look up.
+        state_store (StateStore, optional): Store of record states; guidelines whose PDF URL
+            was found by an earlier resolve run are not looked up again.
 
-if __name__ == "__main__":
-    checkpoint_data = load_checkpoint()
+    Returns:
+        dict: Resolution with pdf_url, source, error and started_at keys. When no PDF URL
+            was found, error lists the failure category of each source that failed,
+            e.g. "ebm_portal=transient, google=blocked".
+    """
+    started_at = time.time()
+    state = state_store.record_state(record_id(guideline)) if state_store else None
+    if state and state["status"] == "resolved" and state["pdf_url"]:
+        return {"pdf_url": state["pdf_url"], "source": state["source"], "error": None, "started_at": started_at}
+
+    try:
+        category, pdf_url, source, failures = get_category_and_pdf(guideline)
+        error = None
+        if not pdf_url and failures:
+            error = ", ".join(f"{name}={failure}" for name, failure in failures.items())
+    except Exception as exception_err:
+        logging.error(f"Unexpected error resolving {guideline['title']}: {exception_err}")
+        pdf_url, source, error = None, None, str(exception_err)
+    return {"pdf_url": pdf_url, "source": source, "error": error, "started_at": started_at}
+
+
+def download_guideline(guideline, resolution):
+    """
+    Download stage of the pipeline: save the resolved PDF for a single guideline.
 
-    # Load previous progress if it exists - corrected loading and variable name
-    if os.path.exists(OUTPUT_FILE):
-        with open(OUTPUT_FILE, "r") as outfile_read:  # More descriptive variable name
-            updated_guidelines_data = json.load(outfile_read)
-    else:
-        with open(INPUT_FILE, "r") as infile_read:    # More descriptive variable name
-            updated_guidelines_data = json.load(infile_read)
+    Args:
+        guideline (GuidelineRecord): Guideline record being processed.
+        resolution (dict, optional): Output of resolve_guideline; None if the resolver crashed.
 
-    start_index = 2148
-    end_index = 4296
-    selected_guidelines = updated_guidelines_data[start_index:end_index]
+    Returns:
+        dict: Attempt outcome with keys:
+            pdf_saved (bool): True if the PDF was downloaded.
+            pdf_url (str, optional): URL of the PDF if one was found, otherwise None.
+            pdf_sha256 (str, optional): SHA-256 of the saved PDF.
+            source (str, optional): Source that produced pdf_url.
+            error (str, optional): Download failure reason, or the message of an unexpected error.
+            started_at (float): Epoch time the attempt started.
+            duration (float): Seconds the attempt took, including time spent queued.
+    """
+    if resolution is None:
+        resolution = {"pdf_url": None, "source": None, "error": "resolver crashed", "started_at": time.time()}
+
+    title = guideline["title"]
+    pdf_url = resolution["pdf_url"]
+    pdf_saved_status = False
+    pdf_sha256 = None
+    error = resolution["error"]
+    folder_name = os.path.join(OUTPUT_FOLDER, title.replace(" ", "_").replace(":", "").replace("/", ""))
+    save_path = os.path.join(folder_name, f"{title.replace(' ', '_').replace(':', '').replace('/', '')}.pdf")
+
+    if pdf_url:
+        try:
+            os.makedirs(folder_name, exist_ok=True)
+            pdf_sha256 = pdf_store.lookup_url(pdf_url)
+            cached_failure = None if pdf_sha256 else negative_cache.failure("download", canonical_url(pdf_url))
+            if pdf_sha256:
+                # Same URL already fetched for another record - link to the stored copy
+                logging.info(f"Reusing stored PDF {pdf_sha256} for {title}")
+                pdf_store.link(pdf_sha256, save_path)
+                pdf_saved_status = True
+            elif cached_failure:
+                logging.info(f"Skipping download, it failed ({cached_failure[0]}) recently: {pdf_url}")
+                error = cached_failure[0]
+            else:
+                pdf_saved_status, failure_reason, pdf_sha256 = download_pdf_file(pdf_url, save_path)
+                if pdf_saved_status:
+                    pdf_store.ingest(save_path, pdf_sha256, pdf_url)
+                else:
+                    error = failure_reason
+                    negative_cache.record_failure("download", canonical_url(pdf_url), failure_reason)
+        except Exception as exception_err:
+            logging.error(f"Error saving PDF for {title}: {exception_err}")
+            pdf_saved_status = False
+            error = str(exception_err)
+
+    if not pdf_saved_status and os.path.exists(folder_name) and not os.path.exists(f"{save_path}.part"):
+        shutil.rmtree(folder_name)  # Delete empty folder, but keep partial downloads for resuming
+
+    return {
+        "pdf_saved": pdf_saved_status,
+        "pdf_url": pdf_url,
+        "pdf_sha256": pdf_sha256,
+        "source": resolution["source"],
+        "error": error,
+        "started_at": resolution["started_at"],
+        "duration": time.time() - resolution["started_at"],
+    }
+
+
+def record_resolution(guideline, resolution):
+    """
+    Final pipeline stage in resolve mode: report the PDF URL without downloading it.
 
-    progress_bar = tqdm(
-        total=len(selected_guidelines), desc="Processing Guidelines", unit="item"
-    )
+    Args:
+        guideline (GuidelineRecord): Guideline record being processed.
+        resolution (dict, optional): Output of resolve_guideline; None if the resolver crashed.
 
+    Returns:
+        dict: Attempt outcome with the keys of download_guideline plus status, which is
+            "resolved" when a PDF URL was found and "failed" otherwise.
+    """
+    if resolution is None:
+        resolution = {"pdf_url": None, "source": None, "error": "resolver crashed", "started_at": time.time()}
+    return {
+        "pdf_saved": False,
+        "status": "resolved" if resolution["pdf_url"] else "failed",
+        "pdf_url": resolution["pdf_url"],
+        "pdf_sha256": None,
+        "source": resolution["source"],
+        "error": resolution["error"],
+        "started_at": resolution["started_at"],
+        "duration": time.time() - resolution["started_at"],
+    }
+
+
+def configure_run(race, wait_for_category, search_cache_file):
+    """
+    Apply the command line options the lookups depend on, sizing the driver pool for racing.
 
-    progress_bar = tqdm(
-        total=len(updated_guidelines_data), desc="Processing Guidelines", unit="item"
+    Args:
+        race (bool): Query the search sources concurrently instead of in order.
+        wait_for_category (bool): Let Trip Database finish after a winner for its category label.
+        search_cache_file (str): Path of the search and negative cache database.
+    """
+    run_options.update(race=race, wait_for_category=wait_for_category, search_cache_file=search_cache_file)
+    driver_pool.resize(RESOLVER_WORKERS * (len(SEARCH_SOURCES) if race else 1))
+    # The caches connect lazily, so the path can change until the first lookup
+    search_cache.db_path = search_cache_file
+    negative_cache.db_path = search_cache_file
+
+
+def should_process(state, mode):
+    """
+    Decide from the stored state of a record whether this run processes it.
+
+    Args:
+        state (dict): Output of StateStore.record_state, or None for an unregistered record.
+        mode (str): One of RUN_MODES.
+
+    Returns:
+        bool: True if the record is due, False if an earlier run already handled it.
+    """
+    if state is None:
+        return True
+    status = state["status"]
+    if mode == "retry-failed":
+        return status == "failed"
+    if status == "completed" or (status == "resolved" and mode == "resolve"):
+        return False
+    if status == "failed" and state["finished_at"] is not None:
+        # Failed guidelines wait until the TTL of their last error has passed since their last attempt
+        return time.time() - state["finished_at"] >= failure_ttl(state["error"])
+    return True
+
+
+def iter_stripe(source_file, state_store, mode, start=0, end=None, stripe=(0, 1)):
+    """
+    Stream the records of one stripe of the corpus, each marked as due or already handled.
+
+    Args:
+        source_file (str): Guideline JSON or JSONL file.
+        state_store (StateStore): Store of record states.
+        mode (str): One of RUN_MODES.
+        start (int): Position of the first record to read.
+        end (int, optional): Position after the last record to read.
+        stripe (tuple): (i, N) - only records whose position modulo N is i are read.
+
+    Yields:
+        tuple: (position, record ID, guideline, due) for each record of the stripe.
+    """
+    stripe_index, stripe_count = stripe
+    for position, guideline in iter_guidelines(source_file, start, end):
+        if position % stripe_count != stripe_index:
+            continue
+        guideline_id = record_id(guideline)
+        yield position, guideline_id, guideline, should_process(state_store.record_state(guideline_id), mode)
+
+
+def iter_pending(source_file, state_store, mode, start=0, end=None, stripe=(0, 1)):
+    """
+    Stream the records of one stripe that this run processes.
+
+    Args:
+        See iter_stripe.
+
+    Yields:
+        tuple: ((position, record ID), GuidelineRecord) pairs holding only the fields workers read.
+    """
+    for position, guideline_id, guideline, due in iter_stripe(source_file, state_store, mode, start, end, stripe):
+        if due:
+            yield (position, guideline_id), GuidelineRecord(guideline)
+
+
+def process_guidelines(items, mode="download", state_store=None):
+    """
+    Run the resolve/download pipeline over pending guidelines in this process.
+
+    Args:
+        items (iterable): ((position, record ID), GuidelineRecord) pairs, consumed lazily.
+        mode (str): One of RUN_MODES; "resolve" skips the download stage.
+        state_store (StateStore, optional): Store of record states, for PDF URLs found by an earlier resolve run.
+
+    Yields:
+        tuple: ((position, record ID), result) as soon as each guideline has been downloaded.
+    """
+    return run_pipeline(
+        items,
+        functools.partial(resolve_guideline, state_store=state_store),
+        record_resolution if mode == "resolve" else download_guideline,
+        resolver_workers=RESOLVER_WORKERS,
+        download_workers=DOWNLOAD_WORKERS,
+        queue_size=DOWNLOAD_QUEUE_SIZE,
     )
 
-    for guideline in updated_guidelines_data:
-        title = guideline["title"]
-        if title in checkpoint_data["completed"]:
-            logging.info(f"Skipping already processed title: {title}")
-            progress_bar.update(1)
+
+def run_worker(source_file, state_db_file, mode, start, end, stripe, result_queue, limiter_state, options):
+    """
+    Worker process entry point: stream one stripe of the corpus and report each result to the parent.
+
+    Args:
+        source_file (str): Guideline JSON or JSONL file; each worker reads it on its own.
+        state_db_file (str): Path of the state store database.
+        mode (str): One of RUN_MODES.
+        start (int): Position of the first record to read.
+        end (int, optional): Position after the last record to read.
+        stripe (tuple): (i, N) - the worker processes records whose position modulo N is i.
+        result_queue (multiprocessing.Queue): Queue receiving ((position, record ID), result)
+            tuples, followed by None once the stripe is finished.
+        limiter_state (tuple): Per-host limits shared by all workers, from rate_limiter.shared_state.
+        options (dict): run_options of the parent, passed to configure_run.
+    """
+    rate_limiter.use_shared_state(limiter_state)
+    configure_run(**options)  # Worker processes started with spawn do not inherit the parent's options
+    state_store = StateStore(state_db_file)
+    try:
+        pending = iter_pending(source_file, state_store, mode, start, end, stripe)
+        for key, result in process_guidelines(pending, mode, state_store):
+            result_queue.put((key, result))
+    finally:
+        driver_pool.close()  # atexit hooks do not run in multiprocessing children
+        result_queue.put(None)
+
+
+def iter_results(source_file, state_store, mode, start, end, shard, num_workers, pending_count):
+    """
+    Process pending guidelines, in this process or split across worker processes.
+
+    Records are never collected in a list: the single-process path streams them straight
+    into the pipeline, and each worker process streams its own stripe of positions from
+    source_file, so memory stays flat as the corpus grows.
+
+    Args:
+        source_file (str): Guideline JSON or JSONL file.
+        state_store (StateStore): Store of record states.
+        mode (str): One of RUN_MODES.
+        start (int): Position of the first record to process.
+        end (int, optional): Position after the last record to process.
+        shard (tuple): (i, N) - only records whose position modulo N is i are processed.
+        num_workers (int): Maximum number of worker processes to start.
+        pending_count (int): Number of pending records, so no more workers than records start.
+
+    Yields:
+        tuple: ((position, record ID), result) as soon as each guideline finishes, where
+            result is the dict returned by download_guideline.
+    """
+    num_workers = max(1, min(num_workers, pending_count))
+    if num_workers == 1:
+        pending = iter_pending(source_file, state_store, mode, start, end, shard)
+        yield from process_guidelines(pending, mode, state_store)
+        return
+
+    # Worker w of the shard takes every (N * num_workers)-th position, starting at i + N * w
+    shard_index, shard_count = shard
+    stripes = [(shard_index + shard_count * worker_id, shard_count * num_workers) for worker_id in range(num_workers)]
+
+    result_queue = multiprocessing.Queue()
+    # One set of per-host limits for all workers, so adding workers does not multiply them
+    limiter_state = rate_limiter.shared_state(num_workers)
+    workers = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(
+                source_file, state_store.db_path, mode, start, end, stripe, result_queue, limiter_state, run_options
+            ),
+            daemon=True,
+        )
+        for stripe in stripes
+    ]
+    for worker in workers:
+        worker.start()
+
+    finished_workers = 0
+    while finished_workers < num_workers:
+        try:
+            result = result_queue.get(timeout=5)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                logging.error("Worker processes exited before finishing their stripes")
+                break
             continue
+        if result is None:
+            finished_workers += 1
+            continue
+        yield result
+
+    for worker in workers:
+        worker.join()
+
+
+def parse_shard(value):
+    """Parse a --shard value "i/N" into (i, N), with 0 <= i < N."""
+    try:
+        shard_index, shard_count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from None
+    if not 0 <= shard_index < shard_count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 0 and {shard_count - 1}")
+    return shard_index, shard_count
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(
+        description="Find and download guideline PDFs.",
+        epilog="Runs splitting one corpus with --shard use the same --output and --checkpoint. Each keeps its "
+        "results in its own journal and checkpoint file next to them, and a run without --shard (e.g. --mode "
+        "merge) folds those files into the output. Shards run on other machines must first copy their files "
+        "into this directory.",
+    )
+    parser.add_argument("--input", default=INPUT_FILE, help="Guideline JSON or JSONL file to start from.")
+    parser.add_argument(
+        "--output",
+        default=OUTPUT_FILE,
+        help="Guideline file with results; progress continues from it when it exists.",
+    )
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="Checkpoint file of completed/failed records.")
+    parser.add_argument("--state-db", default=STATE_DB_FILE, help="SQLite database of per-guideline state.")
+    parser.add_argument(
+        "--search-cache", default=SEARCH_CACHE_FILE, help="SQLite database of cached search results and failures."
+    )
+    parser.add_argument("--start", type=int, default=0, help="Position of the first guideline to process.")
+    parser.add_argument("--end", type=int, default=None, help="Position after the last guideline to process.")
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=(0, 1),
+        metavar="i/N",
+        help="Only process guidelines whose position modulo N is i.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=NUM_WORKERS,
+        help="Worker processes, each with its own browser. Several --shard runs on one machine should split "
+        "the cores between them.",
+    )
+    parser.add_argument(
+        "--race",
+        action="store_true",
+        default=RACE_SOURCES,
+        help="Query EBM Portal, Trip Database and Google concurrently for each title and keep the first PDF.",
+    )
+    parser.add_argument(
+        "--race-wait-category",
+        action="store_true",
+        default=RACE_WAIT_FOR_CATEGORY,
+        help="With --race, let Trip Database finish after a winner so its category label is kept.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=RUN_MODES,
+        default="download",
+        help="resolve: only find PDF URLs; download: find and download PDFs; "
+        "retry-failed: retry failed guidelines, ignoring remembered search and download failures; "
+        "merge: only fold the results of --shard runs into the output.",
+    )
+    parser.add_argument(
+        "--retry-failed", dest="mode", action="store_const", const="retry-failed", help="Same as --mode retry-failed."
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.race_wait_category and not args.race:
+        parser.error("--race-wait-category requires --race")
+    if args.mode == "merge" and args.shard[1] > 1:
+        parser.error("--mode merge cannot be combined with --shard")
+    return args
 
-        category, pdf_url = get_category_and_pdf(title)  # Corrected function call
-        pdf_saved_status = False
-        folder_name = os.path.join(OUTPUT_FOLDER, title.replace(" ", "_").replace(":", "").replace("/", "")) # Use os.path.join
 
-        if pdf_url:
-            try:
-                os.makedirs(folder_name, exist_ok=True)
-                save_path = os.path.join(folder_name, f"{title.replace(' ', '_').replace(':', '').replace('/', '')}.pdf") # Use os.path.join and f-string
-                pdf_saved_status = download_pdf_file(pdf_url, save_path)
-            except Exception as exception_err:  # More descriptive variable name for exception
-                logging.error(f"Error saving PDF for {title}: {exception_err}") # Use logging for errors
-                pdf_saved_status = False
-
-        # Update JSON data - improved readability
-        guideline["pdf_saved"] = pdf_saved_status
-        guideline["pdf_link"] = pdf_url if pdf_url else ""  # More concise conditional assignment
-
-        if not pdf_saved_status and os.path.exists(folder_name):
-            shutil.rmtree(folder_name)  # Delete empty folder if no PDF was downloaded
-
-        if pdf_saved_status:
-            checkpoint_data["completed"].append(title)
-        else:
-            checkpoint_data["failed"].append(title)
+if __name__ == "__main__":
+    args = parse_args()
+    sharded = args.shard[1] > 1
+    configure_run(args.race, args.race_wait_category, args.search_cache)
+
+    # A --shard run keeps its own checkpoint; other runs merge in those left by shard runs
+    checkpoint_path = shard_file(args.checkpoint, args.shard)
+    checkpoint_data = load_checkpoint(checkpoint_path)
+    shard_checkpoint_paths = [] if sharded else sorted(glob.glob(shard_file(args.checkpoint, args.shard, pattern=True)))
+    for shard_checkpoint_path in shard_checkpoint_paths:
+        for status, ids in load_checkpoint(shard_checkpoint_path).items():
+            checkpoint_data[status] |= ids
+    checkpoint_data["failed"] -= checkpoint_data["completed"]
+
+    # Continue from previous progress if it exists. The corpus is streamed from disk on each
+    # pass and never held in memory as a whole.
+    source_file = args.output if os.path.exists(args.output) else args.input
+
+    # Updates made since the last compaction are kept on disk and only read back when compacting
+    results_journal = ResultsJournal(os.path.splitext(shard_file(args.output, args.shard))[0] + JOURNAL_SUFFIX)
+    shard_journal_pattern = os.path.splitext(shard_file(args.output, args.shard, pattern=True))[0] + JOURNAL_SUFFIX
+    shard_journal_paths = [] if sharded else sorted(glob.glob(shard_journal_pattern))
+
+    # Track per-guideline state in SQLite; the legacy checkpoint seeds it on first run
+    state_store = StateStore(args.state_db)
+    state_store.register(guideline for _, guideline in iter_guidelines(source_file))
+    migrate_checkpoint_titles(checkpoint_data, (guideline for _, guideline in iter_guidelines(source_file)))
+    state_store.import_checkpoint(checkpoint_data)
+
+    if args.mode == "retry-failed":
+        negative_cache.clear()
+
+    # Count the work up front for the progress bar; records are streamed again when processed
+    pending_count = 0
+    skipped_count = 0
+    if args.mode != "merge":
+        for _, _, guideline, due in iter_stripe(source_file, state_store, args.mode, args.start, args.end, args.shard):
+            if due:
+                pending_count += 1
+            else:
+                logging.info(f"Skipping already processed title: {guideline['title']}")
+                skipped_count += 1
 
-        # Save checkpoint and JSON after each iteration - clearer comments
-        save_checkpoint(checkpoint_data)
-        with open(OUTPUT_FILE, "w") as outfile_write: # More descriptive variable name
-            json.dump(updated_guidelines_data, outfile_write, indent=4)
+    progress_bar = tqdm(
+        total=skipped_count + pending_count, initial=skipped_count, desc="Processing Guidelines", unit="item"
+    )
 
-        progress_bar.update(1)
+    signal.signal(signal.SIGTERM, exit_on_sigterm)  # SIGINT already raises KeyboardInterrupt
+    unsaved_results = len(shard_checkpoint_paths)  # Merged shard checkpoints are saved even if nothing runs
+    last_checkpoint_save = time.monotonic()
+    try:
+        results = ()
+        if pending_count:
+            results = iter_results(
+                source_file, state_store, args.mode, args.start, args.end, args.shard, args.workers, pending_count
+            )
+        for (position, guideline_id), result in results:
+            # Journal the change by position - the full JSON is written on compaction
+            updates = {"pdf_saved": result["pdf_saved"], "pdf_link": result["pdf_url"] if result["pdf_url"] else ""}
+            results_journal.append(position, updates)
+            state_store.record_result(guideline_id, result)
+
+            if result["pdf_saved"]:
+                checkpoint_data["completed"].add(guideline_id)
+                checkpoint_data["failed"].discard(guideline_id)
+            elif result.get("status") != "resolved":
+                checkpoint_data["failed"].add(guideline_id)
+
+            # Save checkpoint in batches - only the parent process writes it
+            unsaved_results += 1
+            if (
+                unsaved_results >= CHECKPOINT_FLUSH_EVERY
+                or time.monotonic() - last_checkpoint_save >= CHECKPOINT_FLUSH_INTERVAL
+            ):
+                save_checkpoint(checkpoint_data, checkpoint_path)
+                unsaved_results = 0
+                last_checkpoint_save = time.monotonic()
 
-    print(f"Process Complete! Updated guidelines saved to {OUTPUT_FILE}")
\ No newline at end of file
+            progress_bar.update(1)
+    finally:
+        if unsaved_results:
+            save_checkpoint(checkpoint_data, checkpoint_path)
+        for shard_checkpoint_path in shard_checkpoint_paths:
+            os.remove(shard_checkpoint_path)  # Merged into the checkpoint saved above
+
+        if sharded:
+            # Other shards may still be running; the output is written once a run without --shard merges
+            results_journal.close()
+            logging.info(f"Kept results of shard {args.shard[0]}/{args.shard[1]} in {results_journal.journal_path}")
+        else:
+            shard_journals = [ResultsJournal(shard_journal_path) for shard_journal_path in shard_journal_paths]
+            journaled_updates = results_journal.load_updates()
+            for shard_journal in shard_journals:
+                for position, updates in shard_journal.load_updates().items():
+                    journaled_updates.setdefault(position, {}).update(updates)
+            results_journal.compact(
+                (guideline for _, guideline in iter_updated_guidelines(source_file, journaled_updates)), args.output
+            )
+            results_journal.close()
+            for shard_journal in shard_journals:
+                shard_journal.discard()  # Compacted into the output above
+        logging.info(f"Guideline status counts: {state_store.status_counts()}")
+        state_store.close()
+
+    if sharded:
+        print(f"Shard complete! Run without --shard (e.g. --mode merge) to save results to {args.output}")
+    else:
+        print(f"Process Complete! Updated guidelines saved to {args.output}")
@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PooledDriver:
+    """
+    Thin wrapper around a WebDriver that counts page loads made through it.
+
+    Every attribute other than ``get`` is forwarded to the wrapped driver, so the
+    wrapper can be passed anywhere a Selenium WebDriver is expected.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.page_loads = 0
+
+    def get(self, url):
+        self.page_loads += 1
+        return self.driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class DriverPool:
+    """
+    Keep Selenium WebDrivers warm across guidelines instead of launching Chrome per title.
+
+    Drivers are created lazily with ``driver_factory``, health-checked every time they
+    are checked out, and recycled once they have served ``max_pages`` page loads.
+
+    Args:
+        driver_factory (callable): Function returning a new WebDriver instance.
+        size (int): Maximum number of drivers kept alive at once.
+        max_pages (int): Page loads after which a driver is quit and replaced.
+    """
+
+    def __init__(self, driver_factory, size=1, max_pages=100):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = []
+        self._created = 0
+        # Notified whenever a driver is returned or discarded, so waiters can take the
+        # returned driver or start a replacement for the discarded one
+        self._available = threading.Condition()
+        self._closed = False
+
+    def acquire(self, timeout=None):
+        """
+        Check out a healthy driver, starting a new one if the pool is not yet full.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free driver.
+
+        Returns:
+            PooledDriver: A wrapped, ready-to-use WebDriver.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._created < self.size:
+                        self._created += 1
+                        pooled = None
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free WebDriver")
+                    self._available.wait(remaining)
+
+            if pooled is None:
+                return self._start_driver()
+            if self._is_healthy(pooled):
+                return pooled
+            logging.warning("Discarding unresponsive WebDriver from pool")
+            self._discard(pooled)
+
+    def release(self, pooled, broken=False):
+        """
+        Return a driver to the pool, recycling it if it is broken or worn out.
+
+        Args:
+            pooled (PooledDriver): Driver previously returned by ``acquire``.
+            broken (bool): True if the caller hit an error that left the driver unusable.
+        """
+        with self._available:
+            over_size = self._created > self.size
+        if self._closed or broken or over_size or pooled.page_loads >= self.max_pages:
+            if not broken and not self._closed and not over_size:
+                logging.info(f"Recycling WebDriver after {pooled.page_loads} page loads")
+            self._discard(pooled)
+            return
+        with self._available:
+            self._idle.append(pooled)
+            self._available.notify()
+
+    def resize(self, size):
+        """
+        Change the maximum number of drivers kept alive at once.
+
+        Drivers beyond a smaller size are quit as they are released.
+
+        Args:
+            size (int): New maximum number of drivers.
+        """
+        with self._available:
+            self.size = size
+            self._available.notify_all()
+
+    @contextmanager
+    def driver(self):
+        """Context manager that checks a driver out and always returns it to the pool."""
+        pooled = self.acquire()
+        broken = False
+        try:
+            yield pooled
+        except Exception:
+            broken = not self._is_healthy(pooled)
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        """Quit every idle driver and refuse further checkouts."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def _start_driver(self):
+        try:
+            return PooledDriver(self.driver_factory())
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def _discard(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as exception_err:
+            logging.warning(f"Error while quitting WebDriver: {exception_err}")
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    @staticmethod
+    def _is_healthy(pooled):
+        try:
+            pooled.driver.window_handles
+            return True
+        except Exception:
+            return False
@@ -0,0 +1,147 @@
+import json
+import os
+
+READ_CHUNK_SIZE = 64 * 1024  # Characters read from a JSON array file at a time
+
+_decoder = json.JSONDecoder()
+
+
+def _iter_json_array(guidelines_file):
+    """Yield the elements of a top-level JSON array one at a time, reading the file in chunks."""
+    buffer = ""
+    offset = 0
+    started = False
+    end_of_file = False
+
+    while True:
+        # Skip whitespace, the opening bracket and separators between records
+        while offset < len(buffer) and (buffer[offset].isspace() or buffer[offset] == ","):
+            offset += 1
+        if offset < len(buffer) and not started:
+            if buffer[offset] != "[":
+                raise ValueError("Guideline file does not contain a JSON array")
+            started = True
+            offset += 1
+            continue
+        if offset < len(buffer) and buffer[offset] == "]":
+            return
+
+        if offset < len(buffer):
+            try:
+                record, offset = _decoder.raw_decode(buffer, offset)
+            except json.JSONDecodeError:
+                if end_of_file:
+                    raise
+            else:
+                yield record
+                continue
+
+        if end_of_file:
+            if started:
+                raise ValueError("Guideline file ends before the JSON array is closed")
+            return
+        chunk = guidelines_file.read(READ_CHUNK_SIZE)
+        end_of_file = not chunk
+        buffer = buffer[offset:] + chunk
+        offset = 0
+
+
+def _iter_jsonl(guidelines_file, start):
+    # Blank lines never take a position, so positions match whatever start is
+    position = 0
+    for line in guidelines_file:
+        if not line.strip():
+            continue
+        yield None if position < start else json.loads(line)  # Skipped lines are not parsed
+        position += 1
+
+
+def iter_guidelines(path, start=0, end=None):
+    """
+    Yield guideline records lazily from a JSON array file or a JSONL file.
+
+    Only the current record is held in memory. Records before ``start`` are read past
+    without being returned (JSONL lines are not even parsed), and reading stops at ``end``.
+
+    Args:
+        path (str): Path of a .json file holding one array, or a .jsonl file with one record per line.
+        start (int): Position of the first record to yield.
+        end (int, optional): Position after the last record to yield; None reads to the end.
+
+    Yields:
+        tuple: (position, guideline) pairs in file order.
+    """
+    with open(path, "r", encoding="utf-8") as guidelines_file:
+        if path.endswith(".jsonl"):
+            records = _iter_jsonl(guidelines_file, start)
+        else:
+            records = _iter_json_array(guidelines_file)
+        for position, guideline in enumerate(records):
+            if end is not None and position >= end:
+                return
+            if position >= start:
+                yield position, guideline
+
+
+def write_guidelines(path, guidelines):
+    """
+    Write guideline records to a JSON array (or JSONL) file atomically, one record at a time.
+
+    The JSON layout matches json.dump(guidelines, indent=4), without building the full list.
+
+    Args:
+        path (str): Output path; a .jsonl extension writes one record per line.
+        guidelines (iterable): Guideline records.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as output_file:
+        if path.endswith(".jsonl"):
+            for guideline in guidelines:
+                output_file.write(json.dumps(guideline, ensure_ascii=False) + "\n")
+        else:
+            separator = "[\n"
+            for guideline in guidelines:
+                record = json.dumps(guideline, indent=4)
+                output_file.write(separator + "    " + record.replace("\n", "\n    "))
+                separator = ",\n"
+            output_file.write("[]" if separator == "[\n" else "\n]")
+        output_file.flush()
+        os.fsync(output_file.fileno())
+    os.replace(temp_path, path)
+
+
+class GuidelineRecord:
+    """
+    Compact record holding only the guideline fields the resolver and download workers read.
+
+    Abstracts, ISSN lists and the other fields of the full record are dropped, so pending
+    work handed to worker processes stays small. Fields are read like the full record dict,
+    with record["title"] or record.get("DOI"); results are written back by position through
+    the results journal, never into the record.
+
+    Args:
+        guideline (dict): Full guideline record.
+    """
+
+    __slots__ = ("guidelines_index", "title", "DOI", "URL", "link", "PMC", "publisher")
+
+    def __init__(self, guideline):
+        for field in self.__slots__:
+            setattr(self, field, guideline.get(field))
+
+    def __getitem__(self, field):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        """Return a field like dict.get, with default for missing or unloaded fields."""
+        value = getattr(self, field) if field in self.__slots__ else None
+        return default if value is None else value
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __setstate__(self, state):
+        for field, value in zip(self.__slots__, state):
+            setattr(self, field, value)
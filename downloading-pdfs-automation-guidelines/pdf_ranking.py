@@ -0,0 +1,106 @@
+import re
+from urllib.parse import unquote, urljoin, urlsplit
+
+# Links below this score are not worth a download
+MIN_PDF_LINK_SCORE = 10
+
+CITATION_PDF_SCORE = 60  # Publisher-declared full-text PDF (<meta name="citation_pdf_url">)
+PDF_EXTENSION_SCORE = 20
+# URL path fragments used by publisher full-text PDF endpoints
+PDF_PATH_PATTERNS = {
+    "/doi/pdf/": 20,
+    "/doi/pdfdirect/": 20,
+    "/pdfft": 20,  # Elsevier
+    "/content/pdf/": 20,  # Springer
+    "/pdf/": 10,
+    "download=true": 5,
+}
+PDF_ANCHOR_PATTERNS = {
+    "download pdf": 15,
+    "full text pdf": 15,
+    "article pdf": 15,
+    "pdf": 10,
+    "full text": 5,
+    "download": 3,
+}
+# Markers of files that are not the guideline itself; each one found in the URL or anchor text
+# costs NON_GUIDELINE_PENALTY points. Substrings catch run-together paths like
+# "downloadSupplement"; short markers only count as whole words ("toc" but not "protocol").
+NON_GUIDELINE_SUBSTRINGS = ("supplement", "appendix", "erratum", "corrigendum", "author-guidelines", "/epdf/")
+NON_GUIDELINE_WORDS = {"suppl", "esm", "figure", "fig", "table", "poster", "slides", "cover", "toc"}
+NON_GUIDELINE_PENALTY = 30
+TITLE_OVERLAP_SCORE = 20  # Awarded in proportion to the title words found in the URL or anchor
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _words(text, min_length=3):
+    return set(word for word in _WORD_PATTERN.findall(text.lower()) if len(word) >= min_length)
+
+
+def score_pdf_link(url, anchor_text="", title=None, citation_pdf_url=None):
+    """
+    Score how likely a link is to be the full-text PDF of a guideline.
+
+    Args:
+        url (str): Absolute URL of the link.
+        anchor_text (str): Visible text of the link.
+        title (str, optional): Guideline title, rewarded when its words appear in the link.
+        citation_pdf_url (str, optional): Absolute URL from the page's citation_pdf_url meta tag.
+
+    Returns:
+        int: Score; higher is better.
+    """
+    parts = urlsplit(url)
+    path = unquote(parts.path).lower()
+    full_url = unquote(url).lower()
+    anchor_text = " ".join((anchor_text or "").lower().split())
+
+    score = 0
+    if citation_pdf_url and url == citation_pdf_url:
+        score += CITATION_PDF_SCORE
+    if path.endswith(".pdf"):
+        score += PDF_EXTENSION_SCORE
+    score += max((points for pattern, points in PDF_PATH_PATTERNS.items() if pattern in full_url), default=0)
+    score += max((points for pattern, points in PDF_ANCHOR_PATTERNS.items() if pattern in anchor_text), default=0)
+
+    for marker in NON_GUIDELINE_SUBSTRINGS:
+        if marker in full_url or marker in anchor_text:
+            score -= NON_GUIDELINE_PENALTY
+    score -= NON_GUIDELINE_PENALTY * len(NON_GUIDELINE_WORDS & _words(f"{full_url} {anchor_text}", 1))
+
+    if title:
+        title_words = _words(title)
+        if title_words:
+            link_words = _words(path) | _words(anchor_text)
+            score += round(TITLE_OVERLAP_SCORE * len(title_words & link_words) / len(title_words))
+    return score
+
+
+def best_pdf_link(candidates, base_url, title=None, citation_pdf_url=None):
+    """
+    Pick the most likely full-text PDF among the links of a page.
+
+    Args:
+        candidates (iterable): (href, anchor_text) pairs; hrefs may be relative.
+        base_url (str): URL of the page, used to resolve relative hrefs.
+        title (str, optional): Guideline title.
+        citation_pdf_url (str, optional): Content of the page's citation_pdf_url meta tag.
+
+    Returns:
+        str: Absolute URL of the best link scoring at least MIN_PDF_LINK_SCORE, otherwise None.
+    """
+    if citation_pdf_url:
+        citation_pdf_url = urljoin(base_url, citation_pdf_url.strip())
+        candidates = [(citation_pdf_url, "")] + list(candidates)
+
+    best_url = None
+    best_score = MIN_PDF_LINK_SCORE - 1
+    for href, anchor_text in candidates:
+        if not href or href.startswith(("javascript:", "mailto:", "#")):
+            continue
+        url = urljoin(base_url, href.strip()).split("#")[0]
+        score = score_pdf_link(url, anchor_text, title, citation_pdf_url)
+        if score > best_score:
+            best_url, best_score = url, score
+    return best_url
@@ -0,0 +1,130 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetched_urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def canonical_url(url):
+    """
+    Normalize a PDF URL so that trivially different links to the same file compare equal.
+
+    Lower-cases the scheme and host, drops the fragment and tracking parameters, and sorts
+    the remaining query parameters.
+
+    Args:
+        url (str): URL as found by a resolver.
+
+    Returns:
+        str: Canonical form of the URL.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+class PdfStore:
+    """
+    Content-addressed PDF store: every distinct PDF is kept once, named by its SHA-256.
+
+    Per-guideline paths are hard links to the stored file (symbolic links where hard links
+    are not possible), and an index of fetched canonical URLs lets later records that point
+    at an already downloaded URL reuse it without downloading again.
+
+    Args:
+        root (str): Directory holding the stored PDFs and the URL index.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "fetched_urls.sqlite3")
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(self.root, exist_ok=True)
+            connection = sqlite3.connect(self.index_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def path_for(self, sha256):
+        """Return the storage path of the PDF with the given SHA-256 digest."""
+        return os.path.join(self.root, sha256[:2], f"{sha256}.pdf")
+
+    def lookup_url(self, pdf_url):
+        """
+        Return the digest of a previously fetched URL whose PDF is still in the store.
+
+        Args:
+            pdf_url (str): PDF URL, canonicalized before the lookup.
+
+        Returns:
+            str: SHA-256 digest, or None if the URL has not been fetched yet.
+        """
+        row = self._connection().execute(
+            "SELECT sha256 FROM fetched_urls WHERE url = ?", (canonical_url(pdf_url),)
+        ).fetchone()
+        if row and os.path.exists(self.path_for(row[0])):
+            return row[0]
+        return None
+
+    def ingest(self, downloaded_path, sha256, pdf_url):
+        """
+        Move a freshly downloaded PDF into the store and link it back to its original path.
+
+        If the store already holds a PDF with the same digest, the new copy is discarded.
+
+        Args:
+            downloaded_path (str): Per-guideline path the PDF was downloaded to.
+            sha256 (str): SHA-256 digest computed while downloading.
+            pdf_url (str): URL the PDF was downloaded from.
+        """
+        store_path = self.path_for(sha256)
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        if os.path.exists(store_path):
+            logging.info(f"PDF already stored as {sha256}, deduplicating {downloaded_path}")
+            os.remove(downloaded_path)
+        else:
+            os.replace(downloaded_path, store_path)
+        self.link(sha256, downloaded_path)
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO fetched_urls (url, sha256, fetched_at) VALUES (?, ?, ?)",
+                (canonical_url(pdf_url), sha256, time.time()),
+            )
+
+    def link(self, sha256, save_path):
+        """
+        Point a per-guideline path at the stored PDF.
+
+        Args:
+            sha256 (str): Digest of the stored PDF.
+            save_path (str): Per-guideline path to create.
+        """
+        store_path = self.path_for(sha256)
+        if os.path.lexists(save_path):
+            os.remove(save_path)
+        try:
+            os.link(store_path, save_path)
+        except OSError:
+            os.symlink(os.path.abspath(store_path), save_path)
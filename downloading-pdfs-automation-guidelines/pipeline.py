@@ -0,0 +1,85 @@
+import logging
+import queue
+import threading
+
+_DONE = object()
+
+
+def run_pipeline(items, resolve, download, resolver_workers=1, download_workers=4, queue_size=8):
+    """
+    Run URL discovery and PDF download as two concurrent stages joined by a bounded queue.
+
+    Resolver threads call ``resolve`` and push its result onto the queue; download threads
+    drain it with ``download``. When the queue is full, resolvers block until a download
+    finishes, so neither stage runs far ahead of the other and throughput is set by the
+    slower stage. Items are read lazily, one per free resolver, so an iterator streaming
+    a large corpus is never held in memory.
+
+    Args:
+        items (iterable): (key, guideline) pairs to process.
+        resolve (callable): resolve(guideline) -> resolution, run on resolver threads.
+        download (callable): download(guideline, resolution) -> result, run on download threads.
+        resolver_workers (int): Number of resolver threads (each typically holds a browser).
+        download_workers (int): Number of download threads.
+        queue_size (int): Maximum number of resolved guidelines waiting for a download.
+
+    Yields:
+        tuple: (key, result) as soon as each guideline has been downloaded.
+    """
+    work_items = iter(items)
+    work_items_lock = threading.Lock()  # Generators cannot be advanced by two threads at once
+
+    download_queue = queue.Queue(maxsize=queue_size)
+    result_queue = queue.Queue()
+
+    def resolver_loop():
+        while True:
+            try:
+                with work_items_lock:
+                    item = next(work_items, None)
+            except Exception as exception_err:
+                logging.error(f"Reading work items failed: {exception_err}")
+                return
+            if item is None:
+                return
+            key, guideline = item
+            try:
+                resolution = resolve(guideline)
+            except Exception as exception_err:
+                logging.error(f"Resolver failed for {guideline['title']}: {exception_err}")
+                resolution = None
+            download_queue.put((key, guideline, resolution))  # Blocks while downloads catch up
+
+    def download_loop():
+        while True:
+            queued = download_queue.get()
+            if queued is _DONE:
+                result_queue.put(_DONE)
+                return
+            key, guideline, resolution = queued
+            try:
+                result_queue.put((key, download(guideline, resolution)))
+            except Exception as exception_err:
+                # Leave the guideline unrecorded so the next run retries it
+                logging.error(f"Download stage failed for {guideline['title']}: {exception_err}")
+
+    resolvers = [threading.Thread(target=resolver_loop, daemon=True) for _ in range(resolver_workers)]
+    downloaders = [threading.Thread(target=download_loop, daemon=True) for _ in range(download_workers)]
+    for thread in resolvers + downloaders:
+        thread.start()
+
+    def close_download_queue():
+        for thread in resolvers:
+            thread.join()
+        for _ in downloaders:
+            download_queue.put(_DONE)
+
+    threading.Thread(target=close_download_queue, daemon=True).start()
+
+    finished_downloaders = 0
+    while finished_downloaders < len(downloaders):
+        queued_result = result_queue.get()
+        if queued_result is _DONE:
+            finished_downloaders += 1
+            continue
+        yield queued_result
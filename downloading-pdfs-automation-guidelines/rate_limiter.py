@@ -0,0 +1,145 @@
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Per-host limits as (requests per second, burst, max in flight). Keys match the host
+# and all of its subdomains; the most specific key wins. The sharded runner shares these
+# limits across its worker processes (see RateLimiter.shared_state).
+DEFAULT_HOST_LIMIT = (2.0, 4, 4)
+HOST_LIMITS = {
+    "google.com": (0.2, 1, 1),
+    "tripdatabase.com": (0.5, 2, 2),
+    "ebmportal.com": (0.5, 2, 2),
+    "doi.org": (5.0, 10, 8),
+    "ncbi.nlm.nih.gov": (1.0, 3, 3),
+}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens per second and holding at most ``burst`` tokens.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (int): Bucket capacity.
+        shared (bool): Keep the bucket in shared memory so worker processes started after it
+            was created draw from the same tokens.
+    """
+
+    def __init__(self, rate, burst, shared=False):
+        self.rate = rate
+        self.burst = burst
+        # (tokens, last refill time); time.monotonic() is system-wide, so it is comparable across processes
+        if shared:
+            self._state = multiprocessing.Array("d", [float(burst), time.monotonic()])
+            self._lock = self._state.get_lock()
+        else:
+            self._state = [float(burst), time.monotonic()]
+            self._lock = threading.Lock()
+
+    def take(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens = min(self.burst, self._state[0] + (now - self._state[1]) * self.rate)
+                self._state[1] = now
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    return
+                self._state[0] = tokens
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    Central per-host limiter combining a token bucket with a cap on requests in flight.
+
+    Args:
+        host_limits (dict): Host suffix -> (requests per second, burst, max in flight).
+        default_limit (tuple): Limit for hosts that match no key in host_limits.
+    """
+
+    def __init__(self, host_limits=None, default_limit=DEFAULT_HOST_LIMIT):
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+        self.default_limit = default_limit
+        self._buckets = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _limit_key(self, host):
+        """Return the host_limits key matching host, or host itself for the default limit."""
+        parts = host.lower().split(".")
+        for start in range(len(parts)):
+            suffix = ".".join(parts[start:])
+            if suffix in self.host_limits:
+                return suffix
+        return host.lower()
+
+    def _controls(self, host):
+        key = self._limit_key(host)
+        with self._lock:
+            if key not in self._buckets:
+                rate, burst, max_in_flight = self.host_limits.get(key, self.default_limit)
+                self._buckets[key] = TokenBucket(rate, burst)
+                self._in_flight[key] = threading.BoundedSemaphore(max_in_flight)
+            return self._buckets[key], self._in_flight[key]
+
+    def shared_state(self, num_processes):
+        """
+        Build limiter state for worker processes that must respect the limits together.
+
+        Every host in host_limits gets one token bucket and one in-flight semaphore shared by
+        all processes. Other hosts are not known in advance, so each process gets an equal
+        share of default_limit for them instead.
+
+        Args:
+            num_processes (int): Number of worker processes that will call use_shared_state.
+
+        Returns:
+            tuple: State to pass to each worker process and hand to use_shared_state.
+        """
+        buckets = {}
+        in_flight = {}
+        for key, (rate, burst, max_in_flight) in self.host_limits.items():
+            buckets[key] = TokenBucket(rate, burst, shared=True)
+            in_flight[key] = multiprocessing.BoundedSemaphore(max_in_flight)
+        rate, burst, max_in_flight = self.default_limit
+        default_limit = (
+            rate / num_processes,
+            max(1, burst // num_processes),
+            max(1, max_in_flight // num_processes),
+        )
+        return buckets, in_flight, default_limit
+
+    def use_shared_state(self, state):
+        """
+        Switch this limiter to state built by shared_state in the parent process.
+
+        Args:
+            state (tuple): Value returned by shared_state.
+        """
+        buckets, in_flight, default_limit = state
+        with self._lock:
+            self._buckets = dict(buckets)
+            self._in_flight = dict(in_flight)
+            self.default_limit = default_limit
+
+    @contextmanager
+    def limit(self, url):
+        """
+        Hold one in-flight slot for the host of url and wait for its rate limit.
+
+        Args:
+            url (str): URL about to be requested.
+        """
+        bucket, in_flight = self._controls(urlsplit(url).hostname or "")
+        with in_flight:
+            bucket.take()
+            yield
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+
+from guideline_io import write_guidelines
+
+
+class ResultsJournal:
+    """
+    Append-only JSONL journal of per-guideline result updates.
+
+    Each line holds the position of a record in the guideline list and the fields that
+    changed. The full guideline JSON is only rewritten when the journal is compacted;
+    after a crash, applying the journaled updates to the last compacted output restores progress.
+
+    Args:
+        journal_path (str): Path of the JSONL journal file.
+    """
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self._journal_file = open(journal_path, "a", encoding="utf-8")
+
+    def append(self, position, updates):
+        """
+        Record the updated fields of one guideline.
+
+        Args:
+            position (int): Index of the guideline in the guideline list.
+            updates (dict): Fields to set on the guideline, e.g. pdf_saved and pdf_link.
+        """
+        entry = {"position": position, "updates": updates}
+        self._journal_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal_file.flush()
+
+    def load_updates(self):
+        """
+        Read every journaled update, merged per position, so it can be applied while streaming.
+
+        A truncated last line, left behind by a crash mid-write, is ignored.
+
+        Returns:
+            dict: Position of the guideline -> fields to set on it.
+        """
+        updates = {}
+        with open(self.journal_path, "r", encoding="utf-8") as journal_file:
+            for line_number, line in enumerate(journal_file, start=1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping unreadable journal line {line_number} in {self.journal_path}")
+                    continue
+                updates.setdefault(entry["position"], {}).update(entry["updates"])
+        if updates:
+            logging.info(f"Loaded journaled updates for {len(updates)} guidelines from {self.journal_path}")
+        return updates
+
+    def compact(self, guidelines, output_path):
+        """
+        Write the full guideline list to output_path atomically and truncate the journal.
+
+        Args:
+            guidelines (iterable): Guideline records with all journaled updates applied,
+                consumed one at a time.
+            output_path (str): Path of the full JSON output file.
+        """
+        write_guidelines(output_path, guidelines)
+
+        self._journal_file.close()
+        self._journal_file = open(self.journal_path, "w", encoding="utf-8")
+        logging.info(f"Compacted results journal into {output_path}")
+
+    def close(self):
+        """Close the journal file."""
+        self._journal_file.close()
+
+    def discard(self):
+        """Close and delete the journal file, once its updates have been compacted into an output."""
+        self._journal_file.close()
+        os.remove(self.journal_path)
@@ -0,0 +1,188 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Failure categories - only TRANSIENT and RATE_LIMITED failures are retried
+TRANSIENT = "transient"
+RATE_LIMITED = "rate_limited"
+BLOCKED = "blocked"
+NOT_FOUND = "not_found"
+WRONG_CONTENT = "wrong_content"
+UNEXPECTED = "unexpected_error"
+FAILURE_CATEGORIES = (TRANSIENT, RATE_LIMITED, BLOCKED, NOT_FOUND, WRONG_CONTENT, UNEXPECTED)
+RETRYABLE_CATEGORIES = (TRANSIENT, RATE_LIMITED)
+
+
+class ClassifiedError(Exception):
+    """
+    Failure tagged with its category so callers can decide whether to retry.
+
+    Args:
+        category (str): One of the failure category constants.
+        message (str): Human-readable description.
+        retry_after (float, optional): Seconds the remote host asked us to wait.
+    """
+
+    def __init__(self, category, message, retry_after=None):
+        super().__init__(message)
+        self.category = category
+        self.retry_after = retry_after
+
+
+def classify_status(status_code):
+    """
+    Map an HTTP status code to a failure category.
+
+    Args:
+        status_code (int): HTTP status code of a failed response.
+
+    Returns:
+        str: Failure category.
+    """
+    if status_code == 429:
+        return RATE_LIMITED
+    if status_code in (401, 403):
+        return BLOCKED
+    if status_code in (408, 416) or status_code >= 500:
+        return TRANSIENT  # 416 means our partial file was discarded; a retry starts over
+    return NOT_FOUND
+
+
+def retry_after_seconds(response):
+    """Return the delay requested by a Retry-After header, or None."""
+    if response is None:
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_exception(exception_err):
+    """
+    Map an exception raised while fetching a page or PDF to a failure category.
+
+    Args:
+        exception_err (Exception): The exception to classify.
+
+    Returns:
+        str: Failure category; UNEXPECTED for errors that are not understood.
+    """
+    if isinstance(exception_err, ClassifiedError):
+        return exception_err.category
+    if isinstance(exception_err, requests.exceptions.HTTPError) and exception_err.response is not None:
+        return classify_status(exception_err.response.status_code)
+    if isinstance(
+        exception_err,
+        (
+            requests.exceptions.Timeout,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+            TimeoutException,
+            WebDriverException,
+        ),
+    ):
+        return TRANSIENT
+    return UNEXPECTED
+
+
+class HostCooldowns:
+    """Per-host cooldown deadlines shared by every thread of the process."""
+
+    def __init__(self):
+        self._cooldown_until = {}
+        self._lock = threading.Lock()
+
+    def cool_down(self, host, seconds):
+        """Hold back all requests to host for the next ``seconds`` seconds."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._cooldown_until[host] = max(self._cooldown_until.get(host, 0), until)
+        logging.warning(f"Cooling down {host} for {seconds:.0f}s")
+
+    def wait(self, host):
+        """Sleep until host is out of its cooldown, if it is in one."""
+        with self._lock:
+            until = self._cooldown_until.get(host, 0)
+        remaining = until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+host_cooldowns = HostCooldowns()
+
+
+class RetryPolicy:
+    """
+    Retry transient and rate-limited failures with exponential backoff and full jitter.
+
+    Rate-limited or blocked responses also put the host into a cooldown shared by every
+    thread, so one worker hitting a 429 slows down all requests to that host.
+
+    Args:
+        max_attempts (int): Attempts including the first one.
+        base_delay (float): Backoff before the second attempt, doubled for each later one.
+        max_delay (float): Upper bound of a single backoff.
+        rate_limit_cooldown (float): Host cooldown when no Retry-After header is given.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, rate_limit_cooldown=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_cooldown = rate_limit_cooldown
+
+    def backoff(self, attempt):
+        """Return a jittered delay before retrying after the given failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, func, *args, host=None, **kwargs):
+        """
+        Call func, retrying retryable failures.
+
+        Args:
+            func (callable): Function to call.
+            *args: Positional arguments for func.
+            host (str, optional): Host the call talks to, used for shared cooldowns.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            Whatever func returns.
+
+        Raises:
+            ClassifiedError: When the failure is not retryable or attempts are exhausted.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            if host:
+                host_cooldowns.wait(host)
+            try:
+                return func(*args, **kwargs)
+            except Exception as exception_err:
+                category = classify_exception(exception_err)
+                if host and category in (RATE_LIMITED, BLOCKED):
+                    retry_after = getattr(exception_err, "retry_after", None)
+                    if retry_after is None and isinstance(exception_err, requests.exceptions.HTTPError):
+                        retry_after = retry_after_seconds(exception_err.response)
+                    host_cooldowns.cool_down(host, retry_after or self.rate_limit_cooldown)
+
+                if category not in RETRYABLE_CATEGORIES or attempt == self.max_attempts:
+                    if isinstance(exception_err, ClassifiedError):
+                        raise
+                    raise ClassifiedError(category, str(exception_err)) from exception_err
+
+                delay = self.backoff(attempt)
+                logging.warning(
+                    f"{func.__name__} failed ({category}), attempt {attempt}/{self.max_attempts}, "
+                    f"retrying in {delay:.1f}s: {exception_err}"
+                )
+                time.sleep(delay)
@@ -0,0 +1,203 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_results (
+    source TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    result TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (source, title_key)
+);
+CREATE INDEX IF NOT EXISTS idx_search_results_used_at ON search_results (used_at);
+CREATE TABLE IF NOT EXISTS failed_lookups (
+    source TEXT NOT NULL,
+    lookup_key TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    failed_at REAL NOT NULL,
+    PRIMARY KEY (source, lookup_key)
+);
+"""
+
+
+def normalize_title(title):
+    """
+    Reduce a title to a cache key that ignores case, punctuation and spacing differences.
+
+    Args:
+        title (str): Guideline title.
+
+    Returns:
+        str: Normalized title.
+    """
+    title = unicodedata.normalize("NFKC", title).casefold()
+    return " ".join(re.sub(r"[^\w\s]", " ", title).split())
+
+
+def _connect(db_path):
+    connection = sqlite3.connect(db_path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class SearchCache:
+    """
+    On-disk cache of parsed search results, keyed by source and normalized title.
+
+    Entries older than ``ttl`` seconds are ignored and deleted. Once the cache holds more
+    than ``max_entries`` rows, the least recently used ones are evicted.
+
+    Args:
+        db_path (str): Path of the SQLite database file.
+        ttl (float): Seconds an entry stays valid.
+        max_entries (int): Maximum number of cached results.
+    """
+
+    def __init__(self, db_path, ttl, max_entries):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _connection(self):
+        # Connections are per thread and never reused by a forked shard process
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.connection = _connect(self.db_path)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def get(self, source, title):
+        """
+        Return the cached result of a search.
+
+        Args:
+            source (str): Search source name, e.g. "ebm_portal".
+            title (str): Title that was searched for.
+
+        Returns:
+            The cached result as stored by put(), or None on a miss or expired entry.
+        """
+        key = (source, normalize_title(title))
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT result, stored_at FROM search_results WHERE source = ? AND title_key = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        with connection:
+            if time.time() - row[1] > self.ttl:
+                connection.execute("DELETE FROM search_results WHERE source = ? AND title_key = ?", key)
+                return None
+            connection.execute(
+                "UPDATE search_results SET used_at = ? WHERE source = ? AND title_key = ?", (time.time(), *key)
+            )
+        return json.loads(row[0])
+
+    def put(self, source, title, result):
+        """
+        Store the result of a search, evicting the least recently used entries if full.
+
+        Args:
+            source (str): Search source name.
+            title (str): Title that was searched for.
+            result: JSON-serializable search result.
+        """
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO search_results (source, title_key, result, stored_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source, normalize_title(title), json.dumps(result), now, now),
+            )
+            connection.execute(
+                """
+                DELETE FROM search_results WHERE rowid IN (
+                    SELECT rowid FROM search_results ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+
+class NegativeCache:
+    """
+    On-disk record of lookups and downloads that failed, so they are not repeated until
+    ``ttl`` seconds have passed.
+
+    Each entry holds the source that failed (a search source name, or "download" for PDF
+    URLs), the lookup key (normalized title or canonical URL), the failure reason and time.
+    Reasons listed in ``reason_ttls`` are remembered for their own TTL; a TTL of 0 means
+    failures with that reason are not remembered at all.
+
+    Args:
+        db_path (str): Path of the SQLite database file, shared with SearchCache.
+        ttl (float): Seconds a failure is remembered, unless reason_ttls says otherwise.
+        reason_ttls (dict, optional): Failure reason -> seconds a failure with that reason is remembered.
+    """
+
+    def __init__(self, db_path, ttl, reason_ttls=None):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.reason_ttls = reason_ttls or {}
+        self._local = threading.local()
+
+    def ttl_for(self, reason):
+        """Return the seconds a failure with the given reason is remembered."""
+        return self.reason_ttls.get(reason, self.ttl)
+
+    def _connection(self):
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.connection = _connect(self.db_path)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def failure(self, source, lookup_key):
+        """
+        Return the remembered failure of a lookup.
+
+        Args:
+            source (str): Source name, e.g. "google" or "download".
+            lookup_key (str): Normalized title or canonical URL.
+
+        Returns:
+            tuple: (reason, failed_at) if the lookup failed within the TTL, otherwise None.
+        """
+        row = self._connection().execute(
+            "SELECT reason, failed_at FROM failed_lookups WHERE source = ? AND lookup_key = ?",
+            (source, lookup_key),
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_for(row[0]):
+            return None
+        return row[0], row[1]
+
+    def record_failure(self, source, lookup_key, reason):
+        """
+        Remember that a lookup failed now.
+
+        Args:
+            source (str): Source name.
+            lookup_key (str): Normalized title or canonical URL.
+            reason (str): Failure category, or "no_results" for searches that found nothing.
+        """
+        if self.ttl_for(reason) <= 0:
+            return
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO failed_lookups (source, lookup_key, reason, failed_at) VALUES (?, ?, ?, ?)",
+                (source, lookup_key, reason, time.time()),
+            )
+
+    def clear(self):
+        """Forget every remembered failure."""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM failed_lookups")
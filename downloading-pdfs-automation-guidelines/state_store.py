@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import threading
+import time
+
+from doi_resolver import normalize_doi
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guidelines (
+    record_id TEXT PRIMARY KEY,
+    guidelines_index INTEGER,
+    doi TEXT,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    source TEXT,
+    pdf_url TEXT,
+    pdf_sha256 TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_guidelines_status ON guidelines (status);
+CREATE INDEX IF NOT EXISTS idx_guidelines_doi ON guidelines (doi);
+"""
+
+# Prefixes of the IDs returned by record_id()
+RECORD_ID_PREFIXES = ("index:", "doi:", "title:")
+
+
+def record_id(guideline):
+    """
+    Return a stable identifier for a guideline record.
+
+    Args:
+        guideline (dict): Guideline record.
+
+    Returns:
+        str: "index:<guidelines_index>" when the record has an index, otherwise
+            "doi:<normalized DOI>", falling back to "title:<title>".
+    """
+    if guideline.get("guidelines_index") is not None:
+        return f"index:{guideline['guidelines_index']}"
+    doi = normalize_doi(guideline.get("DOI")) or normalize_doi(guideline.get("URL"))
+    if doi:
+        return f"doi:{doi.lower()}"
+    return f"title:{guideline['title']}"
+
+
+class StateStore:
+    """
+    SQLite-backed store of per-guideline processing state.
+
+    Each guideline has one row keyed by record_id, holding its status ("pending",
+    "resolved", "completed" or "failed"), the source, URL and SHA-256 of its PDF, the number of attempts,
+    timings of the last attempt and the last error. Every update is its own transaction.
+    Each thread and worker process gets its own connection, so resolver threads can read
+    record states while the main thread records results.
+
+    Args:
+        db_path (str): Path of the SQLite database file.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self):
+        """Connection of the current thread, opened on first use in each thread and process."""
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def register(self, guidelines):
+        """
+        Add rows for guidelines that are not in the store yet.
+
+        Args:
+            guidelines (iterable): Guideline records.
+        """
+        rows = (
+            (
+                record_id(guideline),
+                guideline.get("guidelines_index"),
+                normalize_doi(guideline.get("DOI")),
+                guideline["title"],
+            )
+            for guideline in guidelines
+        )
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO guidelines (record_id, guidelines_index, doi, title) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def import_checkpoint(self, checkpoint_data):
+        """
+        Carry over the completed/failed record IDs of checkpoint.json.
+
+        Only rows that are still pending are updated, so repeated imports are harmless.
+
+        Args:
+            checkpoint_data (dict): Checkpoint with "completed" and "failed" sets of record IDs.
+        """
+        with self.connection:
+            for status in ("completed", "failed"):
+                self.connection.executemany(
+                    "UPDATE guidelines SET status = ? WHERE record_id = ? AND status = 'pending'",
+                    ((status, guideline_id) for guideline_id in checkpoint_data.get(status, ())),
+                )
+
+    def record_result(self, guideline_id, result):
+        """
+        Store the outcome of one processing attempt in a single transaction.
+
+        Args:
+            guideline_id (str): Record ID from record_id().
+            result (dict): Attempt outcome with pdf_saved, pdf_url, pdf_sha256, source, error,
+                started_at and duration keys, and an optional status overriding the one
+                derived from pdf_saved (e.g. "resolved" when only the URL was looked up).
+        """
+        status = result.get("status") or ("completed" if result["pdf_saved"] else "failed")
+        with self.connection:
+            self.connection.execute(
+                """
+                UPDATE guidelines
+                SET status = ?, source = ?, pdf_url = ?, pdf_sha256 = ?, attempts = attempts + 1,
+                    started_at = ?, finished_at = ?, duration = ?, error = ?
+                WHERE record_id = ?
+                """,
+                (
+                    status,
+                    result.get("source"),
+                    result.get("pdf_url"),
+                    result.get("pdf_sha256"),
+                    result.get("started_at"),
+                    time.time(),
+                    result.get("duration"),
+                    result.get("error"),
+                    guideline_id,
+                ),
+            )
+
+    def record_ids_with_status(self, *statuses):
+        """
+        Return the IDs of all records in any of the given statuses.
+
+        Args:
+            *statuses (str): Statuses to select, e.g. "pending", "failed".
+
+        Returns:
+            set: Matching record IDs.
+        """
+        placeholders = ", ".join("?" for _ in statuses)
+        cursor = self.connection.execute(
+            f"SELECT record_id FROM guidelines WHERE status IN ({placeholders})", statuses
+        )
+        return {row[0] for row in cursor}
+
+    def record_state(self, guideline_id):
+        """
+        Return the stored state of one record.
+
+        Args:
+            guideline_id (str): Record ID from record_id().
+
+        Returns:
+            dict: status, source, pdf_url, error and finished_at of the record, or None if
+                it is not registered.
+        """
+        row = self.connection.execute(
+            "SELECT status, source, pdf_url, error, finished_at FROM guidelines WHERE record_id = ?",
+            (guideline_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("status", "source", "pdf_url", "error", "finished_at"), row))
+
+    def status_counts(self):
+        """Return a dict mapping each status to its number of records."""
+        cursor = self.connection.execute("SELECT status, COUNT(*) FROM guidelines GROUP BY status")
+        return dict(cursor.fetchall())
+
+    def close(self):
+        """Close the database connection of the current thread."""
+        self.connection.close()
+        self._local.pid = None
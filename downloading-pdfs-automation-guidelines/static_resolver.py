@@ -0,0 +1,258 @@
+import logging
+from urllib.parse import quote, quote_plus, urljoin, urlsplit
+
+from lxml import html
+
+from http_session import get_session
+from pdf_ranking import best_pdf_link
+from rate_limiter import rate_limiter
+from retry_policy import ClassifiedError, RetryPolicy
+
+STATIC_TIMEOUT = 10
+STATIC_HEADERS = {"Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"}
+STATIC_RETRY_POLICY = RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=5.0)
+
+# Pages with fewer visible characters than this and at least one script are treated as JS shells
+JS_SHELL_MIN_TEXT = 200
+JS_SHELL_ROOT_IDS = ("root", "app", "__next", "__nuxt")
+JS_SHELL_MARKERS = ("enable javascript", "javascript is required", "javascript is disabled")
+BLOCK_PAGE_MARKERS = ("just a moment...", "attention required!", "access denied")
+
+PDF_LINK_XPATH = ".//a[substring(@href, string-length(@href) - 3) = '.pdf']"
+# Candidate full-text links on publisher pages (href contains "pdf" in any case)
+PDF_CANDIDATE_XPATH = "//a[contains(translate(@href, 'PDF', 'pdf'), 'pdf')]"
+
+# Meta-tag fast path - only the <head> of a landing page is read
+HEAD_CHUNK_SIZE = 8 * 1024
+HEAD_MAX_BYTES = 256 * 1024
+CITATION_PDF_META_XPATH = "//meta[@name='citation_pdf_url' or @name='bepress_citation_pdf_url']/@content"
+
+
+def _has_class(class_name):
+    """Return an XPath predicate matching elements carrying the given CSS class."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _get_page(url):
+    with rate_limiter.limit(url):
+        response = get_session().get(url, headers=STATIC_HEADERS, timeout=STATIC_TIMEOUT)
+    response.raise_for_status()
+    return response
+
+
+def fetch_citation_pdf_url(url):
+    """
+    Read the <head> of a landing page over plain HTTP and return its citation_pdf_url.
+
+    The response is streamed and closed as soon as </head> has arrived, so the page body
+    is never downloaded.
+
+    Args:
+        url (str): URL of the landing page.
+
+    Returns:
+        str: Absolute PDF URL declared by the page, otherwise None.
+    """
+    head = b""
+    try:
+        with rate_limiter.limit(url), get_session().get(
+            url, headers=STATIC_HEADERS, stream=True, timeout=STATIC_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            if "html" not in response.headers.get("Content-Type", "").lower():
+                return None
+            final_url = response.url
+            for chunk in response.iter_content(chunk_size=HEAD_CHUNK_SIZE):
+                head += chunk
+                if b"</head>" in head[-len(chunk) - 7 :].lower() or len(head) >= HEAD_MAX_BYTES:
+                    break
+    except Exception as exception_err:
+        logging.info(f"Could not read the head of {url}: {exception_err}")
+        return None
+
+    try:
+        meta_urls = html.fromstring(head).xpath(CITATION_PDF_META_XPATH)
+    except Exception as exception_err:
+        logging.info(f"Could not parse the head of {url}: {exception_err}")
+        return None
+    meta_urls = [meta_url.strip() for meta_url in meta_urls if meta_url.strip()]
+    if not meta_urls:
+        return None
+
+    pdf_url = urljoin(final_url, meta_urls[0])
+    logging.info(f"Found citation_pdf_url on {final_url}: {pdf_url}")
+    return pdf_url
+
+
+def fetch_page(url):
+    """
+    Fetch a page over plain HTTP and parse it, without starting a browser.
+
+    Args:
+        url (str): URL of the page to fetch.
+
+    Returns:
+        tuple: A tuple containing:
+            final_url (str, optional): URL after redirects, None if the fetch failed.
+            document (lxml.html.HtmlElement, optional): Parsed page, None if the page is
+                not HTML, could not be fetched, or needs JavaScript to render.
+    """
+    try:
+        response = STATIC_RETRY_POLICY.call(_get_page, url, host=urlsplit(url).netloc)
+    except ClassifiedError as classified_err:
+        logging.info(f"Static fetch failed ({classified_err.category}), browser needed for {url}")
+        return None, None
+
+    if "html" not in response.headers.get("Content-Type", "").lower():
+        return None, None
+
+    try:
+        document = html.fromstring(response.content, base_url=response.url)
+    except Exception as exception_err:
+        logging.info(f"Could not parse static HTML from {url}: {exception_err}")
+        return None, None
+
+    if is_js_shell(document):
+        logging.info(f"Page needs JavaScript, escalating to browser: {url}")
+        return None, None
+    return response.url, document
+
+
+def is_js_shell(document):
+    """
+    Detect pages whose content is rendered client-side or hidden behind a bot check.
+
+    Args:
+        document (lxml.html.HtmlElement): Parsed page.
+
+    Returns:
+        bool: True if the static HTML cannot be trusted and a browser is required.
+    """
+    page_title = (document.findtext(".//title") or "").strip().lower()
+    if any(marker in page_title for marker in BLOCK_PAGE_MARKERS):
+        return True
+
+    for noscript in document.iter("noscript"):
+        noscript_text = noscript.text_content().lower()
+        if any(marker in noscript_text for marker in JS_SHELL_MARKERS):
+            return True
+
+    for root_id in JS_SHELL_ROOT_IDS:
+        root = document.get_element_by_id(root_id, None)
+        if root is not None and len(root) == 0 and not root.text_content().strip():
+            return True
+
+    body = document.find("body")
+    if body is None:
+        return True
+    visible_text = " ".join(
+        body.xpath(
+            ".//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]"
+        )
+    )
+    has_scripts = bool(document.xpath("//script"))
+    return has_scripts and len(" ".join(visible_text.split())) < JS_SHELL_MIN_TEXT
+
+
+def static_search_ebm_portal(title):
+    """
+    Search EBM Portal over plain HTTP and extract the PDF link of the first result.
+
+    Args:
+        title (str): The title of the guideline to search for.
+
+    Returns:
+        str: PDF URL if found, otherwise None (the caller should retry with the browser).
+    """
+    search_url = f"https://guidelines.ebmportal.com/?q={quote_plus(title)}"
+    final_url, document = fetch_page(search_url)
+    if document is None:
+        return None
+
+    result_links = document.xpath(f"//article[{_has_class('node')}]//a/@href")
+    if not result_links:
+        return None
+
+    guideline_url, guideline_page = fetch_page(urljoin(final_url, result_links[0]))
+    if guideline_page is None:
+        return None
+
+    pdf_links = guideline_page.xpath(
+        f"//a[{_has_class('btn')} and {_has_class('btn-default')} and {_has_class('button')}]"
+        "[substring(@href, string-length(@href) - 3) = '.pdf']/@href"
+    )
+    if not pdf_links:
+        return None
+
+    pdf_url = urljoin(guideline_url, pdf_links[0])
+    logging.info(f"Found PDF on EBM Portal (static): {pdf_url}")
+    return pdf_url
+
+
+def static_search_trip_database(expected_title):
+    """
+    Search Trip Database over plain HTTP, verify the first result and extract its category and PDF.
+
+    Args:
+        expected_title (str): The expected title of the guideline.
+
+    Returns:
+        tuple: (category_label, pdf_link) when the static page could be parsed; either value
+            may be None. Returns None if the page needs the browser.
+    """
+    search_url = (
+        f"https://www.tripdatabase.com/Searchresult?criteria={quote(expected_title)}&search_type=standard"
+    )
+    final_url, document = fetch_page(search_url)
+    if document is None:
+        return None
+
+    results = document.xpath(f"//*[{_has_class('result')}]")
+    if not results:
+        return None
+    first_result = results[0]
+
+    title_elements = first_result.xpath(".//a//h5")
+    if not title_elements:
+        return None
+    actual_title = title_elements[0].text_content().strip()
+    logging.info(f"Found Title in Trip Database (static): {actual_title}")
+
+    if actual_title.lower() != expected_title.lower():
+        logging.warning(
+            f"Title mismatch in Trip Database. Expected: '{expected_title}', Found: '{actual_title}'"
+        )
+        return None, None
+
+    badges = first_result.xpath(
+        f".//*[{_has_class('result--taxonomies')}]//*[{_has_class('badge-evidence-secondary')}]"
+    )
+    category_label = badges[0].text_content().strip() if badges else None
+    pdf_links = first_result.xpath(PDF_LINK_XPATH + "/@href")
+    pdf_link = urljoin(final_url, pdf_links[0]) if pdf_links else None
+    return category_label, pdf_link
+
+
+def static_extract_pdf_from_webpage(webpage_url, title=None):
+    """
+    Fetch a landing page over plain HTTP and return its best-ranked PDF link.
+
+    Args:
+        webpage_url (str): URL of the webpage to check.
+        title (str, optional): Guideline title, used to rank the candidate links.
+
+    Returns:
+        str: PDF URL if found, otherwise None (the caller should retry with the browser).
+    """
+    final_url, document = fetch_page(webpage_url)
+    if document is None:
+        return None
+
+    candidates = [(anchor.get("href"), anchor.text_content()) for anchor in document.xpath(PDF_CANDIDATE_XPATH)]
+    citation_pdf_urls = document.xpath("//meta[@name='citation_pdf_url']/@content")
+    pdf_url = best_pdf_link(candidates, final_url, title, citation_pdf_urls[0] if citation_pdf_urls else None)
+    if not pdf_url:
+        return None
+
+    logging.info(f"Found PDF on webpage (static): {pdf_url}")
+    return pdf_url